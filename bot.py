@@ -8,19 +8,27 @@ ULTIMATE WORKING VERSION - LOOSENED STRATEGY
 """
 
 import os
+import sys
 import time
+import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import io
 import json
+import csv
 import argparse
 import tempfile
 import math
-from datetime import datetime
+from collections import namedtuple
 from dotenv import load_dotenv
 import pandas as pd
 import numpy as np
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
+import atexit
 import traceback
+import functools
 
 # Binance client
 try:
@@ -32,10 +40,48 @@ except Exception as e:
     Client = None
     BINANCE_AVAILABLE = False
 
+# Async HTTP client for the strategy loop
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ aiohttp not available: {e}")
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+# Faster event loop (Linux/macOS only)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except Exception:
+    uvloop = None
+    UVLOOP_AVAILABLE = False
+
+# JIT for indicator kernels (plain Python loops without it)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Fast JSON for state persistence (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ orjson not available, using json: {e}")
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 # FastAPI + dashboard
 try:
     from fastapi import FastAPI
-    from fastapi.responses import HTMLResponse, JSONResponse
+    from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
     from fastapi.staticfiles import StaticFiles
     import uvicorn
     FASTAPI_AVAILABLE = True
@@ -43,16 +89,30 @@ except Exception as e:
     print(f"⚠️ FastAPI not available: {e}")
     FASTAPI_AVAILABLE = False
 
-# Custom JSON encoder for NaN values
-class SafeJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, float):
-            if math.isnan(obj) or math.isinf(obj):
-                return None
-        return super().default(obj)
+def _fmt_num(value, digits):
+    """Display string for a numeric state field (floats, or strings written by older versions)"""
+    try:
+        return f"{float(value):.{digits}f}"
+    except (TypeError, ValueError):
+        return "" if value is None else str(value)
+
+# NaN/inf are not valid JSON: turn them into null before stdlib json serialization
+def _scrub_nonfinite(obj, _isfinite=math.isfinite, _float=float, _dict=dict, _seq=(list, tuple), _np_scalar=np.generic):
+    if isinstance(obj, _float):
+        return obj if _isfinite(obj) else None
+    if isinstance(obj, _dict):
+        return {k: _scrub_nonfinite(v) for k, v in obj.items()}
+    if isinstance(obj, _seq):
+        return [_scrub_nonfinite(v) for v in obj]
+    if isinstance(obj, _np_scalar):
+        # numpy scalars (float32, int64, bool_) that stdlib json rejects; orjson handles them natively
+        return _scrub_nonfinite(obj.item())
+    return obj
 
 if FASTAPI_AVAILABLE:
-    app = FastAPI(title="Trading Bot", version="1.0.0")
+    # orjson writes NaN/inf as null, so API payloads need no pre-cleaning
+    app = FastAPI(title="Trading Bot", version="1.0.0",
+                  default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse)
 else:
     app = None
 
@@ -60,13 +120,19 @@ else:
 load_dotenv()
 
 # Enhanced Logging Setup
+_log_listener = None
+
 def setup_logging():
-    """Setup comprehensive logging with rotation"""
+    """Setup comprehensive logging with rotation; file/console writes run on a listener thread"""
+    global _log_listener
     logger = logging.getLogger('trading_bot')
-    logger.setLevel(logging.INFO)
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    logger.setLevel(level)
     
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    if _log_listener is not None:
+        _log_listener.stop()
     
     file_handler = RotatingFileHandler(
         'trading_bot.log', 
@@ -74,10 +140,10 @@ def setup_logging():
         backupCount=5,
         encoding='utf-8'
     )
-    file_handler.setLevel(logging.INFO)
+    file_handler.setLevel(level)
     
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(level)
     
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -86,11 +152,19 @@ def setup_logging():
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _log_listener.start()
     
     return logger
 
+def _stop_logging():
+    if _log_listener is not None:
+        _log_listener.stop()
+
+atexit.register(_stop_logging)
+
 logger = setup_logging()
 
 # Config - LOOSENED PARAMETERS
@@ -110,6 +184,21 @@ TRADE_USDT = float(os.getenv("TRADE_USDT", 50.0))
 
 PORT = int(os.getenv("PORT", 8000))
 
+BINANCE_REST_URL = "https://testnet.binance.vision/api/v3" if USE_TESTNET else "https://api.binance.com/api/v3"
+BINANCE_WS_URL = "wss://testnet.binance.vision/stream" if USE_TESTNET else "wss://stream.binance.com:9443/stream"
+HTTP_POOL_SIZE = 64
+HTTP_KEEPALIVE_SECONDS = 75  # idle REST connections outlive CHECK_INTERVAL, so ticks reuse them
+PRICE_CACHE_TTL = 1.0  # seconds a fetched price is reused for the same symbol
+
+KLINE_INTERVAL = '15m'
+KLINE_LIMIT = 100
+KLINE_COLUMNS = ["open_time", "open", "high", "low", "close", "volume", "close_time"]
+# One float64 array per column; what the strategy path reads instead of a DataFrame
+Klines = namedtuple("Klines", KLINE_COLUMNS)
+WAKE_PRICE_MOVE_PERCENT = 0.002  # wake a symbol's strategy early on a 0.2% move since its last run
+# Kline events arrive every ~2s per active symbol; this long with none means the stream is a zombie
+STREAM_STALE_SECONDS = 60
+
 # ✅ LOOSENED INDICATOR PARAMETERS
 EMA_FAST = 7      # Reduced from 9
 EMA_SLOW = 18     # Reduced from 21  
@@ -124,7 +213,9 @@ ADX_THR = 15      # Reduced from 20 - MORE SIGNALS
 CONFIRMATION_REQUIRED = 2
 
 ATR_LEN = 14
+SL_EMA_SPAN = 50
 ATR_SL_MULT = 1.5  # Reduced from 2.0
+SL_FALLBACK_PERCENT = 0.01  # SL distance when there are too few bars for EMA/ATR
 
 RISK_REWARD_RATIO = 2.0
 TP1_PERCENT = 0.008   # Reduced from 0.01
@@ -135,6 +226,7 @@ TP1_CLOSE_PERCENT = 0.35
 TP2_CLOSE_PERCENT = 0.30  
 TP3_CLOSE_PERCENT = 0.20
 TRAILING_PERCENT = 0.15
+TP_CLOSE_LEVELS = (("tp1", TP1_CLOSE_PERCENT), ("tp2", TP2_CLOSE_PERCENT), ("tp3", TP3_CLOSE_PERCENT))
 
 TRAILING_ACTIVATION_PERCENT = 0.025
 TRAILING_DISTANCE_PERCENT = 0.008
@@ -149,6 +241,8 @@ SYMBOLS = [
 BASE_DIR = os.path.dirname(__file__) or "."
 TRADES_FILE = os.path.join(BASE_DIR, "trades.csv")
 STATE_FILE  = os.path.join(BASE_DIR, "state.json")
+STATE_FLUSH_DELAY = 0.25  # seconds a deferred state write waits to absorb further updates
+TRADE_COLUMNS = ["Trade #","Symbol","Side","Type","Date/Time","Signal","Price","Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"]
 
 _state_lock = threading.RLock()
 
@@ -322,16 +416,15 @@ if FASTAPI_AVAILABLE:
                 "short": {"total": 0, "success": 0, "fail": 0}
             })
             
-            cleaned_stats = json.loads(json.dumps(stats, cls=SafeJSONEncoder))
-            
-            return {
-                "long": cleaned_stats.get("long", {"total": 0, "success": 0, "fail": 0}),
-                "short": cleaned_stats.get("short", {"total": 0, "success": 0, "fail": 0}),
+            result = {
+                "long": stats.get("long", {"total": 0, "success": 0, "fail": 0}),
+                "short": stats.get("short", {"total": 0, "success": 0, "fail": 0}),
                 "symbols_count": len(SYMBOLS),
                 "dry_run": DRY_RUN,
                 "confirmations": CONFIRMATION_REQUIRED,
                 "open_trades_count": len(state.get("open_trades", {}))
             }
+            return result if ORJSON_AVAILABLE else _scrub_nonfinite(result)
         except Exception as e:
             logger.error(f"Stats API error: {e}")
             return {"error": str(e)}
@@ -343,34 +436,37 @@ if FASTAPI_AVAILABLE:
             open_trades = state.get("open_trades", {})
             result = []
             
-            for symbol, trade in open_trades.items():
-                current_price = get_latest_price(symbol)
+            # Look up all prices at once, off the event loop the strategies share
+            prices = await asyncio.gather(*(asyncio.to_thread(get_latest_price, symbol) for symbol in open_trades))
+            
+            for (symbol, trade), current_price in zip(open_trades.items(), prices):
                 tp_targets = trade.get("tp_targets", {})
-                
-                cleaned_trade = json.loads(json.dumps(trade, cls=SafeJSONEncoder))
+                partial = trade.get("partial_profit")
                 
                 result.append({
                     "symbol": symbol,
-                    "side": cleaned_trade.get("side", ""),
-                    "entry_price": cleaned_trade.get("entry_price", ""),
+                    "side": trade.get("side", ""),
+                    "entry_price": _fmt_num(trade.get("entry_price"), 4),
                     "current_price": f"{current_price:.4f}" if current_price else "N/A",
-                    "quantity": cleaned_trade.get("total_quantity", ""),
-                    "trade_num": cleaned_trade.get("trade_num", 0),
+                    "quantity": _fmt_num(trade.get("total_quantity"), 6),
+                    "trade_num": trade.get("trade_num", 0),
                     "pnl": 0,
-                    "entry_time": cleaned_trade.get("entry_time", ""),
-                    "sl": cleaned_trade.get("sl", ""),
-                    "tp1": cleaned_trade.get("tp1", ""),
-                    "tp2": cleaned_trade.get("tp2", ""),
-                    "tp3": cleaned_trade.get("tp3", ""),
+                    "entry_time": trade.get("entry_time", ""),
+                    "sl": _fmt_num(trade.get("sl"), 4),
+                    "tp1": _fmt_num(trade.get("tp1"), 4),
+                    "tp2": _fmt_num(trade.get("tp2"), 4),
+                    "tp3": _fmt_num(trade.get("tp3"), 4),
                     "tp1_hit": tp_targets.get("tp1", {}).get("hit", False),
                     "tp2_hit": tp_targets.get("tp2", {}).get("hit", False),
                     "tp3_hit": tp_targets.get("tp3", {}).get("hit", False),
-                    "remaining_quantity": cleaned_trade.get("remaining_quantity", ""),
-                    "trailing_active": cleaned_trade.get("trailing_active", False),
-                    "partial_profit": cleaned_trade.get("partial_profit", "")
+                    "remaining_quantity": _fmt_num(trade.get("remaining_quantity"), 6),
+                    "trailing_active": trade.get("trailing_active", False),
+                    # The page appends " USDT" itself
+                    "partial_profit": f"{_usdt_value(partial):+.2f}" if partial else ""
                 })
             
-            return result
+            # The stdlib JSONResponse rejects NaN/inf
+            return result if ORJSON_AVAILABLE else _scrub_nonfinite(result)
         except Exception as e:
             logger.error(f"Open trades API error: {e}")
             return {"error": str(e)}
@@ -378,27 +474,28 @@ if FASTAPI_AVAILABLE:
     @app.get("/api/trade-history")
     async def get_trade_history():
         try:
-            df = safe_read_trades()
+            cols = ["Trade #", "Symbol", "Side", "Price", "Net P&L", "Date/Time"]
+            df = read_trades_tail(20, usecols=cols)
             if df.empty:
                 return []
             
-            recent_trades = df.tail(20).to_dict('records')
+            recent = df.reindex(columns=cols)
+            # Empty CSV cells come back as NaN, which is not valid JSON
+            recent = recent.astype(object).where(recent.notna(), None)
             result = []
             
-            for trade in recent_trades:
-                cleaned_trade = json.loads(json.dumps(trade, cls=SafeJSONEncoder))
-                
+            for trade_num, symbol, side, price, pnl, when in recent.itertuples(index=False, name=None):
                 result.append({
-                    "trade_num": cleaned_trade.get("Trade #", ""),
-                    "symbol": cleaned_trade.get("Symbol", ""),
-                    "side": cleaned_trade.get("Side", ""),
-                    "entry_price": cleaned_trade.get("Price", ""),
-                    "exit_price": cleaned_trade.get("Price", ""),
-                    "pnl": cleaned_trade.get("Net P&L", "0"),
-                    "time": cleaned_trade.get("Date/Time", "")
+                    "trade_num": trade_num if trade_num is not None else "",
+                    "symbol": symbol or "",
+                    "side": side or "",
+                    "entry_price": price or "",
+                    "exit_price": price or "",
+                    "pnl": pnl if pnl is not None else "0",
+                    "time": when or ""
                 })
             
-            return result
+            return result if ORJSON_AVAILABLE else _scrub_nonfinite(result)
         except Exception as e:
             logger.error(f"Trade history API error: {e}")
             return {"error": str(e)}
@@ -416,19 +513,27 @@ if FASTAPI_AVAILABLE:
             return {"error": str(e)}
 
 # Enhanced Error Handling Decorator
-def safe_execute(default_return=None, max_retries=3):
+# Errors worth retrying: network/file hiccups and Binance API errors
+TRANSIENT_ERRORS = (OSError, BinanceAPIException) if BINANCE_AVAILABLE else (OSError,)
+
+def safe_execute(default_return=None, max_retries=3, retry_on=(Exception,)):
+    """Return `default_return` instead of raising; retry with backoff only for `retry_on` errors"""
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             last_exception = None
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
+                except retry_on as e:
                     last_exception = e
                     logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {str(e)}")
                     if attempt < max_retries - 1:
                         time.sleep(2 ** attempt)
                     continue
+                except Exception as e:
+                    last_exception = e
+                    break
             logger.error(f"All retries failed for {func.__name__}: {str(last_exception)}")
             return default_return
         return wrapper
@@ -444,139 +549,340 @@ def _to_float(x, default=0.0):
         logger.debug(f"Float conversion failed for {x}: {e}")
         return default
 
+TRADE_TIME_FORMAT = "%b %d, %Y, %H:%M"
+ENTRY_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"  # same text as datetime.now().isoformat(timespec="seconds")
+
+def _now_str():
+    """Current local time in the trades.csv Date/Time format"""
+    return time.strftime(TRADE_TIME_FORMAT)
+
+class _KeepNumericChars(dict):
+    """str.translate table that drops every character except digits, '.' and '-'"""
+    def __missing__(self, key):
+        return None
+
+_NUMERIC_CHARS = _KeepNumericChars({ord(c): ord(c) for c in "0123456789.-"})
+
 def _ensure_state_keys(st: dict):
     if not isinstance(st, dict):
         st = {}
     if "open_trades" not in st:
         st["open_trades"] = {}
-    if "stats" not in st:
-        st["stats"] = {
-            "long": {"total": 0, "success": 0, "fail": 0},
-            "short": {"total": 0, "success": 0, "fail": 0}
-        }
+    stats = st.get("stats")
+    if not isinstance(stats, dict):
+        stats = st["stats"] = {}
+    for side in ("long", "short"):
+        counters = stats.setdefault(side, {})
+        for key in ("total", "success", "fail"):
+            counters.setdefault(key, 0)
     if "trade_history" not in st:
         st["trade_history"] = []
     return st
 
 # Enhanced File helpers
-@safe_execute(default_return=pd.DataFrame())
-def safe_read_trades():
+@safe_execute(default_return=pd.DataFrame(), max_retries=1)
+def safe_read_trades(usecols=None):
     with _state_lock:
         try:
             if os.path.exists(TRADES_FILE):
-                df = pd.read_csv(TRADES_FILE, dtype=str)
+                # A callable usecols tolerates logs missing some of the requested columns
+                df = pd.read_csv(TRADES_FILE, dtype=str,
+                                 usecols=(lambda c: c in usecols) if usecols else None)
                 logger.info(f"Successfully loaded {len(df)} trades from CSV")
                 return df
             else:
                 logger.info("Trades file does not exist, returning empty DataFrame")
         except Exception as e:
             logger.error(f"Error reading trades file: {e}")
-        cols = ["Trade #","Symbol","Side","Type","Date/Time","Signal","Price","Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"]
-        return pd.DataFrame(columns=cols)
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+def read_trades_tail(n, usecols=None):
+    """Last `n` rows of the trade log, read backwards from the end of the file instead of parsing all of it"""
+    with _state_lock:
+        try:
+            with open(TRADES_FILE, "rb") as f:
+                header = f.readline()
+                body_start = f.tell()
+                pos = f.seek(0, os.SEEK_END)
+                data = b""
+                # Rows never contain embedded newlines, so n+1 newlines guarantee n whole rows
+                while pos > body_start and data.count(b"\n") <= n:
+                    step = min(8192, pos - body_start)
+                    pos -= step
+                    f.seek(pos)
+                    data = f.read(step) + data
+            lines = data.splitlines(keepends=True)
+            if pos > body_start:
+                lines = lines[1:]
+            return pd.read_csv(io.BytesIO(header + b"".join(lines[-n:])), dtype=str,
+                               usecols=(lambda c: c in usecols) if usecols else None)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        except Exception as e:
+            logger.warning(f"Tail read of trades file failed, reading it whole: {e}")
+            return safe_read_trades(usecols=usecols).tail(n)
+
+# Running sum of the log's "Net P&L" column and how far into the file it has been read
+_pnl_total = {"ino": None, "offset": 0, "col": None, "total": 0.0}
+
+def net_pnl_total():
+    """Sum of the trade log's "Net P&L" column, parsing only rows appended since the last call"""
+    cache = _pnl_total
+    with _state_lock:
+        try:
+            with open(TRADES_FILE, "rb") as f:
+                st = os.fstat(f.fileno())
+                offset = cache["offset"]
+                # A replaced, truncated or rewritten file no longer continues where we stopped
+                stale = cache["ino"] != st.st_ino or st.st_size < offset
+                if not stale and offset:
+                    f.seek(offset - 1)
+                    stale = f.read(1) != b"\n"
+                if stale:
+                    cache.update(ino=st.st_ino, offset=0, col=None, total=0.0)
+                f.seek(cache["offset"])
+                data = f.read()
+        except FileNotFoundError:
+            cache.update(ino=None, offset=0, col=None, total=0.0)
+            return 0.0
+        
+        # Only whole rows; a row still being written is picked up next time
+        end = data.rfind(b"\n") + 1
+        col, total = cache["col"], cache["total"]
+        for row in csv.reader(io.StringIO(data[:end].decode("utf-8", "replace"))):
+            if col is None:
+                col = row.index("Net P&L") if "Net P&L" in row else -1
+                continue
+            if 0 <= col < len(row):
+                try:
+                    total += float(row[col].translate(_NUMERIC_CHARS))
+                except ValueError:
+                    pass
+        cache.update(offset=cache["offset"] + end, col=col, total=total)
+        return total
 
-@safe_execute(default_return=False)
+@safe_execute(default_return=False, max_retries=1)
 def append_trade_row(row: dict):
     with _state_lock:
         try:
-            cols = ["Trade #","Symbol","Side","Type","Date/Time","Signal","Price","Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"]
-            df = safe_read_trades()
-            df = df[[c for c in df.columns if c in cols]] if not df.empty else pd.DataFrame(columns=cols)
-            
-            for c in cols:
-                if c not in df.columns:
-                    df[c] = ""
-            
-            new_row = {c: row.get(c,"") for c in cols}
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            df.to_csv(TRADES_FILE, index=False, columns=cols)
+            new_row = {c: row.get(c,"") for c in TRADE_COLUMNS}
+            # One open both checks the header and appends; "a+" writes always land at the end
+            with open(TRADES_FILE, "a+", newline="", encoding="utf-8") as f:
+                f.seek(0)
+                header = next(csv.reader(f), None)
+                appendable = header is None or header == TRADE_COLUMNS
+                if appendable:
+                    # Common case: plain append, no need to re-read and rewrite the whole log
+                    writer = csv.writer(f, lineterminator=os.linesep)
+                    if header is None:
+                        writer.writerow(TRADE_COLUMNS)
+                    writer.writerow(new_row.values())
+            if not appendable:
+                # Non-standard header: rewrite once with the expected columns
+                df = safe_read_trades()
+                df = df[[c for c in df.columns if c in TRADE_COLUMNS]] if not df.empty else pd.DataFrame(columns=TRADE_COLUMNS)
+                
+                for c in TRADE_COLUMNS:
+                    if c not in df.columns:
+                        df[c] = ""
+                
+                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+                df.to_csv(TRADES_FILE, index=False, columns=TRADE_COLUMNS)
+                _pnl_total["ino"] = None
             logger.info(f"Successfully appended trade #{row.get('Trade #', 'N/A')} to CSV")
             return True
         except Exception as e:
             logger.error(f"Failed to append trade row: {e}")
             return False
 
-@safe_execute(default_return={})
+def _dump_state_bytes(st):
+    """Serialize state to UTF-8 JSON bytes; NaN/inf become null"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(st, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_scrub_nonfinite(st), indent=2, ensure_ascii=False).encode("utf-8")
+
+def _parse_state_bytes(data):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+# Last bytes read from / written to state.json, keyed by (inode, mtime, size);
+# the dashboard also writes the file, so any change on disk forces a re-read.
+# "pending" holds a deferred write not yet flushed; reads see it until the file changes externally
+_state_cache = {"sig": None, "data": None, "pending": None}
+_state_flush_timer = None
+
+def _state_file_sig():
+    st = os.stat(STATE_FILE)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+@safe_execute(default_return={}, max_retries=1)
 def load_state():
     with _state_lock:
         try:
-            if not os.path.exists(STATE_FILE):
+            try:
+                sig = _state_file_sig()
+            except FileNotFoundError:
+                _state_cache["pending"] = None
                 logger.info("State file does not exist, returning empty state")
                 return {}
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                st = json.load(f) or {}
+            if sig == _state_cache["sig"]:
+                data = _state_cache["pending"] or _state_cache["data"]
+            else:
+                # External write (dashboard) wins over a deferred trailing update
+                _state_cache["pending"] = None
+                with open(STATE_FILE, "rb") as f:
+                    data = f.read()
                 logger.debug("Successfully loaded state from file")
+            # Parsing the cached bytes hands every caller its own copy to mutate
+            st = _parse_state_bytes(data) or {}
+            if _state_cache["pending"] is None:
+                _state_cache["sig"], _state_cache["data"] = sig, data
         except Exception as e:
             logger.error(f"Error loading state file: {e}")
             st = {}
         st = _ensure_state_keys(st)
         return st
 
-@safe_execute(default_return=False)
-def save_state(st):
+@safe_execute(default_return=False, max_retries=1)
+def save_state(st, defer=False):
+    """Write state.json; `defer` coalesces frequent low-stakes updates into one write per STATE_FLUSH_DELAY"""
+    global _state_flush_timer
     with _state_lock:
         try:
             st = _ensure_state_keys(st)
-            retries = 6
-            delay = 0.08
-            data = json.dumps(st, indent=2, ensure_ascii=False, cls=SafeJSONEncoder)
-            
-            for attempt in range(retries):
-                try:
-                    dirn = os.path.dirname(STATE_FILE) or "."
-                    fd, tmp = tempfile.mkstemp(prefix="state_", dir=dirn, text=True)
-                    try:
-                        with os.fdopen(fd, "w", encoding="utf-8") as tmpf:
-                            tmpf.write(data)
-                        os.replace(tmp, STATE_FILE)
-                        logger.debug("Successfully saved state to file")
-                        return True
-                    finally:
-                        if os.path.exists(tmp):
-                            try:
-                                os.remove(tmp)
-                            except Exception:
-                                pass
-                except PermissionError:
-                    logger.warning(f"Permission error saving state, retry {attempt + 1}")
-                    time.sleep(delay)
-                    delay *= 1.5
-                except Exception as e:
-                    logger.warning(f"Error saving state, retry {attempt + 1}: {e}")
-                    time.sleep(delay)
-                    delay *= 1.5
-            
-            logger.error("Failed to save state after all retries")
-            return False
+            data = _dump_state_bytes(st)
+            if defer:
+                # Nothing queued and the file already holds these bytes: no flush needed
+                if _state_cache["pending"] is None and data == _state_cache["data"]:
+                    return True
+                _state_cache["pending"] = data
+                if _state_flush_timer is None:
+                    _state_flush_timer = threading.Timer(STATE_FLUSH_DELAY, flush_state)
+                    _state_flush_timer.daemon = True
+                    _state_flush_timer.start()
+                return True
+            # A direct save supersedes any deferred one
+            _state_cache["pending"] = None
+            return _write_state_bytes(data)
         except Exception as e:
             logger.error(f"Unexpected error in save_state: {e}")
             return False
 
-@safe_execute(default_return=1)
-def next_trade_number():
+def flush_state():
+    """Write out a deferred save_state(defer=True), unless the file changed on disk since"""
+    global _state_flush_timer
     with _state_lock:
+        _state_flush_timer = None
+        data, _state_cache["pending"] = _state_cache["pending"], None
+        if data is None:
+            return True
         try:
-            df = safe_read_trades()
-            if df.empty or "Trade #" not in df.columns:
-                return 1
-            nums = pd.to_numeric(df["Trade #"], errors="coerce")
-            if nums.notna().any():
-                next_num = int(nums.max()) + 1
-                logger.debug(f"Next trade number: {next_num}")
-                return next_num
-            return 1
+            if _state_file_sig() != _state_cache["sig"]:
+                logger.debug("State file changed externally, dropping deferred write")
+                return False
+        except FileNotFoundError:
+            return False
+        return _write_state_bytes(data)
+
+atexit.register(flush_state)
+
+def _write_state_bytes(data):
+    """Atomic temp-file + rename; caller holds _state_lock"""
+    try:
+        retries = 6
+        delay = 0.08
+        # Skip the temp-file write + rename when the file on disk already holds these bytes
+        if data == _state_cache["data"]:
+            try:
+                if _state_file_sig() == _state_cache["sig"]:
+                    return True
+            except FileNotFoundError:
+                pass
+        
+        for attempt in range(retries):
+            try:
+                dirn = os.path.dirname(STATE_FILE) or "."
+                fd, tmp = tempfile.mkstemp(prefix="state_", dir=dirn)
+                try:
+                    with os.fdopen(fd, "wb") as tmpf:
+                        tmpf.write(data)
+                    os.replace(tmp, STATE_FILE)
+                    _state_cache["sig"], _state_cache["data"] = _state_file_sig(), data
+                    logger.debug("Successfully saved state to file")
+                    return True
+                finally:
+                    if os.path.exists(tmp):
+                        try:
+                            os.remove(tmp)
+                        except Exception:
+                            pass
+            except PermissionError:
+                logger.warning(f"Permission error saving state, retry {attempt + 1}")
+                time.sleep(delay)
+                delay *= 1.5
+            except Exception as e:
+                logger.warning(f"Error saving state, retry {attempt + 1}: {e}")
+                time.sleep(delay)
+                delay *= 1.5
+        
+        logger.error("Failed to save state after all retries")
+        return False
+    except Exception as e:
+        logger.error(f"Unexpected error writing state: {e}")
+        return False
+
+def _next_trade_number_from_csv():
+    df = safe_read_trades(usecols=["Trade #"])
+    if df.empty or "Trade #" not in df.columns:
+        return 1
+    best = 0
+    for v in df["Trade #"].dropna():
+        try:
+            best = max(best, int(float(v)))
+        except ValueError:
+            continue
+    return best + 1
+
+# Highest trade number handed out by this process; another symbol's stale
+# state snapshot can roll the on-disk counter back, this never goes backwards
+_last_trade_num = 0
+
+@safe_execute(default_return=1, max_retries=1)
+def next_trade_number(state=None):
+    """Hand out the next trade number from state["next_trade_num"].
+
+    The counter is bumped on disk under the lock so concurrent symbols never
+    share a number; a caller-held `state` gets the new value too, so saving it
+    afterwards does not roll the counter back.
+    """
+    global _last_trade_num
+    with _state_lock:
+        try:
+            st = load_state()
+            next_num = st.get("next_trade_num")
+            if not next_num:
+                # Older state files: seed once from the trade log
+                next_num = _next_trade_number_from_csv()
+            next_num = max(int(next_num), _last_trade_num + 1)
+            _last_trade_num = next_num
+            st["next_trade_num"] = next_num + 1
+            save_state(st)
+            if state is not None:
+                state["next_trade_num"] = max(int(state.get("next_trade_num") or 0), next_num + 1)
+            logger.debug(f"Next trade number: {next_num}")
+            return next_num
         except Exception as e:
             logger.error(f"Error calculating next trade number: {e}")
             return 1
 
-@safe_execute(default_return=False)
+@safe_execute(default_return=False, max_retries=1)
 def reset_history():
+    global _last_trade_num
     with _state_lock:
         try:
-            df_init = pd.DataFrame(columns=[
-                "Trade #","Symbol","Side","Type","Date/Time","Signal","Price",
-                "Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"
-            ])
+            _last_trade_num = 0
+            df_init = pd.DataFrame(columns=TRADE_COLUMNS)
             df_init.to_csv(TRADES_FILE, index=False)
             save_state(_ensure_state_keys({}))
             logger.info("Trade history and state cleared successfully")
@@ -585,7 +891,7 @@ def reset_history():
             logger.error(f"Error resetting history: {e}")
             return False
 
-@safe_execute(default_return=False)
+@safe_execute(default_return=False, max_retries=1)
 def ensure_files():
     try:
         if not os.path.exists(TRADES_FILE):
@@ -599,73 +905,213 @@ def ensure_files():
         return False
 
 # Enhanced Indicators with Error Handling
-@safe_execute(default_return=pd.Series([50.0]))
-def rsi(series: pd.Series, length=14):
-    try:
-        delta = series.diff()
-        up = delta.clip(lower=0.0)
-        down = -delta.clip(upper=0.0)
-        roll_up = up.ewm(alpha=1/length, adjust=False).mean()
-        roll_down = down.ewm(alpha=1/length, adjust=False).mean()
-        rs = roll_up / roll_down.replace(0, np.nan)
-        r = 100 - (100 / (1 + rs))
-        return r.fillna(50.0)
-    except Exception as e:
-        logger.error(f"RSI calculation error: {e}")
-        length_data = len(series) if hasattr(series, "__len__") else 1
-        return pd.Series([50.0] * length_data)
-
-@safe_execute(default_return=(pd.Series([0.0]), pd.Series([0.0]), pd.Series([0.0])))
-def calculate_adx(df, period=14):
-    try:
-        if df.empty:
-            return pd.Series([0.0]), pd.Series([0.0]), pd.Series([0.0])
-            
-        high = df['high']; low = df['low']; close = df['close']
-        tr1 = high - low
-        tr2 = (high - close.shift()).abs()
-        tr3 = (low - close.shift()).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        plus_dm = high.diff()
-        minus_dm = (-low.diff()).abs()
-        plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
-        minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
-        atr_val = tr.rolling(period).mean()
-        plus_di = 100 * (plus_dm.rolling(period).mean() / atr_val.replace(0, np.nan))
-        minus_di = 100 * (minus_dm.rolling(period).mean() / atr_val.replace(0, np.nan))
-        dx = (abs(plus_di - minus_di) / (plus_di + minus_di).replace(0, np.nan)) * 100
-        adx = dx.rolling(period).mean().fillna(0)
-        return plus_di.fillna(0), minus_di.fillna(0), adx
-    except Exception as e:
-        logger.error(f"ADX calculation error: {e}")
-        length = len(df) if hasattr(df, "__len__") else 0
-        return pd.Series([0]*length), pd.Series([0]*length), pd.Series([0]*length)
-
-@safe_execute(default_return=pd.Series([0.0]))
-def atr(df: pd.DataFrame, length=14):
-    try:
-        if df.empty:
-            return pd.Series([0.0])
-            
-        high = df['high']; low = df['low']; close = df['close']
-        tr1 = high - low
-        tr2 = (high - close.shift()).abs()
-        tr3 = (low - close.shift()).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(length).mean().fillna(0)
-    except Exception as e:
-        logger.error(f"ATR calculation error: {e}")
-        length_data = len(df) if hasattr(df, "__len__") else 0
-        return pd.Series([0]*length_data)
+@njit(cache=True)
+def _tr_dm(high, low, close):
+    """True range, +DM and -DM per bar"""
+    n = high.shape[0]
+    tr = np.empty(n)
+    plus_dm = np.zeros(n)
+    minus_dm = np.zeros(n)
+    for i in range(n):
+        hl = high[i] - low[i]
+        if i == 0:
+            tr[i] = hl
+            continue
+        pc = close[i - 1]
+        tr[i] = max(hl, abs(high[i] - pc), abs(low[i] - pc))
+        up = high[i] - high[i - 1]
+        down = abs(low[i] - low[i - 1])
+        p = up if (up > down and up > 0.0) else 0.0
+        plus_dm[i] = p
+        minus_dm[i] = down if (down > p and down > 0.0) else 0.0
+    return tr, plus_dm, minus_dm
+
+@njit(cache=True)
+def _di_dx(tr, plus_dm, minus_dm, period):
+    """+DI, -DI (0 where undefined) and DX (NaN where undefined) from rolling means"""
+    n = tr.shape[0]
+    plus_di = np.zeros(n)
+    minus_di = np.zeros(n)
+    dx = np.full(n, np.nan)
+    for i in range(period - 1, n):
+        sum_tr = 0.0
+        sum_p = 0.0
+        sum_m = 0.0
+        for j in range(i - period + 1, i + 1):
+            sum_tr += tr[j]
+            sum_p += plus_dm[j]
+            sum_m += minus_dm[j]
+        if sum_tr == 0.0:
+            continue
+        pdi = 100.0 * sum_p / sum_tr
+        mdi = 100.0 * sum_m / sum_tr
+        plus_di[i] = pdi
+        minus_di[i] = mdi
+        if pdi + mdi != 0.0:
+            dx[i] = abs(pdi - mdi) / (pdi + mdi) * 100.0
+    return plus_di, minus_di, dx
+
+@njit(cache=True)
+def _close_scan(close, decays, rsi_alpha):
+    """One pass over `close`: the ewm(adjust=True) (numerator, denominator) for every decay
+    plus the last Wilder-smoothed RSI gains/losses"""
+    m = decays.shape[0]
+    nums = np.zeros(m)
+    dens = np.zeros(m)
+    au = np.nan
+    ad = np.nan
+    seeded = False
+    for i in range(close.shape[0]):
+        x = close[i]
+        for j in range(m):
+            nums[j] = nums[j] * decays[j] + x
+            dens[j] = dens[j] * decays[j] + 1.0
+        if i == 0:
+            continue
+        d = x - close[i - 1]
+        if np.isnan(d):
+            continue
+        u = d if d > 0.0 else 0.0
+        w = -d if d < 0.0 else 0.0
+        if seeded:
+            au += rsi_alpha * (u - au)
+            ad += rsi_alpha * (w - ad)
+        else:
+            au = u
+            ad = w
+            seeded = True
+    return nums, dens, au, ad
+
+# symbol -> indicator state over the closed bars of the current window; rebuilt when a bar opens
+_indicator_cache = {}
+
+def as_klines(data):
+    """Klines for a kline DataFrame; Klines pass through unchanged"""
+    if isinstance(data, Klines):
+        return data
+    if data is None or len(data) == 0:
+        return Klines(*(np.empty(0) for _ in KLINE_COLUMNS))
+    return Klines(*(data[c].to_numpy(dtype=np.float64) for c in KLINE_COLUMNS))
+
+def _build_indicator_state(bars):
+    high = bars.high[:-1]
+    low = bars.low[:-1]
+    close = bars.close[:-1]
+    # EMA fast/slow/mid and the SL EMA, in that order
+    decays = 1.0 - 2.0 / (np.array([EMA_FAST, EMA_SLOW, EMA_MID, SL_EMA_SPAN], dtype=np.float64) + 1)
+    nums, dens, avg_up, avg_down = _close_scan(close, decays, 1.0 / RSI_LEN)
+    emas = [(decays[j], nums[j], dens[j]) for j in range(3)]
+    tr, plus_dm, minus_dm = _tr_dm(high, low, close)
+    _, _, dx = _di_dx(tr, plus_dm, minus_dm, ADX_LEN)
+    k = ADX_LEN - 1
+    return {
+        "emas": emas,
+        "rsi": (avg_up, avg_down),
+        "prev": (high[-1], low[-1], close[-1]),
+        "dm_sums": (tr[-k:].sum(), plus_dm[-k:].sum(), minus_dm[-k:].sum()),
+        "dx_sum": dx[-k:].sum(),
+        "sl_ema": (decays[3], nums[3], dens[3]),
+        "atr_sum": tr[-(ATR_LEN - 1):].sum(),
+    }
+
+def warm_indicator_kernels():
+    """Compile (or load from the numba cache) every indicator kernel before the first live tick"""
+    if not NUMBA_AVAILABLE:
+        return
+    started = time.perf_counter()
+    close = np.linspace(100.0, 101.0, 30)
+    # Stream windows are writable copies; arrays taken from pandas frames are read-only.
+    # numba compiles each variant separately.
+    for writeable in (True, False):
+        bars = Klines(np.arange(30.0), close.copy(), close + 0.5, close - 0.5, close.copy(), np.ones(30), np.arange(30.0))
+        for column in bars:
+            column.flags.writeable = writeable
+        _build_indicator_state(bars)
+    logger.info(f"⚡ Indicator kernels ready in {time.perf_counter() - started:.2f}s")
+
+def _indicator_entry(symbol, bars):
+    """Cached closed-bar state for `symbol`, rebuilt only when a new candle arrives"""
+    open_time = bars.open_time
+    key = (len(open_time), open_time[0], open_time[-1])
+    entry = _indicator_cache.get(symbol)
+    if entry is None or entry["key"] != key:
+        entry = _build_indicator_state(bars)
+        entry["key"] = key
+        _indicator_cache[symbol] = entry
+    return entry
+
+def _latest_indicators(symbol, bars):
+    """(ema_fast, ema_slow, ema_mid, rsi, adx) for the last bar of `bars`.
+
+    Only the live last bar changes between ticks, so the closed-bar state is
+    cached per symbol and the last bar is folded in with one update step.
+    Matches ewm(span).mean(), Wilder RSI (ewm(alpha=1/RSI_LEN, adjust=False) of
+    close.diff() gains/losses) and the ADX_LEN rolling-mean DX on the full frame.
+    """
+    entry = _indicator_entry(symbol, bars)
+
+    high, low, close = float(bars.high[-1]), float(bars.low[-1]), float(bars.close[-1])
+    # Timeout wakes often see the live bar untouched since the last tick
+    live = entry.get("live")
+    if live is not None and live[0] == (high, low, close):
+        return live[1]
+    prev_high, prev_low, prev_close = entry["prev"]
+
+    emas = [(num * decay + close) / (den * decay + 1.0) for decay, num, den in entry["emas"]]
+
+    delta = close - prev_close
+    up = delta if delta > 0 else 0.0
+    down = -delta if delta < 0 else 0.0
+    avg_up, avg_down = entry["rsi"]
+    if math.isnan(avg_up):
+        avg_up, avg_down = up, down
+    else:
+        alpha = 1.0 / RSI_LEN
+        avg_up += alpha * (up - avg_up)
+        avg_down += alpha * (down - avg_down)
+    rsi_last = 100 - 100 / (1 + avg_up / avg_down) if avg_down > 0 else 50.0
+
+    tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    dm_up = high - prev_high
+    dm_down = abs(low - prev_low)
+    plus_dm = dm_up if (dm_up > dm_down and dm_up > 0) else 0.0
+    minus_dm = dm_down if (dm_down > plus_dm and dm_down > 0) else 0.0
+    sum_tr, sum_p, sum_m = entry["dm_sums"]
+    sum_tr += tr
+    dx = math.nan
+    if sum_tr != 0:
+        plus_di = 100.0 * (sum_p + plus_dm) / sum_tr
+        minus_di = 100.0 * (sum_m + minus_dm) / sum_tr
+        if plus_di + minus_di != 0:
+            dx = abs(plus_di - minus_di) / (plus_di + minus_di) * 100.0
+    adx_last = (entry["dx_sum"] + dx) / ADX_LEN
+    if math.isnan(adx_last):
+        adx_last = 0.0
+
+    result = (emas[0], emas[1], emas[2], rsi_last, adx_last)
+    entry["live"] = ((high, low, close), result)
+    return result
+
+def _latest_sl_inputs(symbol, bars):
+    """(last close.ewm(span=SL_EMA_SPAN).mean(), last ATR_LEN-bar mean true range) from the cached closed-bar state"""
+    entry = _indicator_entry(symbol, bars)
+    high, low, close = float(bars.high[-1]), float(bars.low[-1]), float(bars.close[-1])
+    _, _, prev_close = entry["prev"]
+    decay, num, den = entry["sl_ema"]
+    ema = (num * decay + close) / (den * decay + 1.0)
+    tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    return ema, (entry["atr_sum"] + tr) / ATR_LEN
 
 # Enhanced Market Helpers
 client = None
 
 def _parse_kline_value(val):
+    """Kline field as float; missing, unparsable or NaN values become 0.0"""
     try:
-        return float(val) if (val is not None and str(val).lower() not in ("nan","none","")) else 0.0
-    except Exception:
+        x = float(val)
+    except (TypeError, ValueError):
         return 0.0
+    return x if x == x else 0.0
 
 def initialize_binance_client():
     global client
@@ -709,82 +1155,296 @@ def initialize_binance_client():
         client = None
         return False
 
-@safe_execute(default_return=pd.DataFrame())
-def get_klines(symbol, interval='15m', limit=100):
-    if client is None:
-        logger.error(f"❌ Binance client not initialized for {symbol}")
-        return pd.DataFrame()
-    
-    try:
-        logger.info(f"📊 Fetching ACTUAL Binance data for {symbol}")
-        raw = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        data = []
-        for k in raw:
-            try:
-                data.append({
-                    "open_time": k[0],
-                    "open": _parse_kline_value(k[1]),
-                    "high": _parse_kline_value(k[2]),
-                    "low": _parse_kline_value(k[3]),
-                    "close": _parse_kline_value(k[4]),
-                    "volume": _parse_kline_value(k[5]),
-                    "close_time": k[6]
-                })
-            except Exception as e:
-                logger.debug(f"Error parsing kline data: {e}")
-                continue
-        
-        df = pd.DataFrame(data)
-        if not df.empty:
-            df.ffill(inplace=True)
-            df.fillna(0, inplace=True)
-            logger.info(f"✅ Successfully fetched {len(df)} ACTUAL klines for {symbol}")
-        else:
-            logger.error(f"❌ No data received for {symbol}")
-            
-        return df
-        
-    except Exception as e:
-        logger.error(f"❌ ACTUAL klines fetch error for {symbol}: {e}")
-        return pd.DataFrame()
+async def _fetch_klines_raw_async(session, symbol, interval='15m', limit=100):
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    async with session.get(f"{BINANCE_REST_URL}/klines", params=params) as response:
+        response.raise_for_status()
+        return await response.json()
+
+# symbol -> (monotonic timestamp, price); dashboard, entry and exit paths hit the same symbol within one tick
+_price_cache = {}
 
-@safe_execute(default_return=None)
+def _cached_price(symbol):
+    entry = _price_cache.get(symbol)
+    if entry is not None and time.monotonic() - entry[0] < PRICE_CACHE_TTL:
+        return entry[1]
+    return None
+
+def _remember_price(symbol, price):
+    _price_cache[symbol] = (time.monotonic(), price)
+    return price
+
+# Set by run_strategies; lets callers outside the strategy loop reuse streamed prices
+_kline_stream = None
+
+@safe_execute(default_return=None, max_retries=1)
 def get_latest_price(symbol):
+    if _kline_stream is not None:
+        price = _kline_stream.last_price(symbol)
+        if price is not None:
+            return price
     return get_validated_price(symbol)
 
-@safe_execute(default_return=None)
-def get_validated_price(symbol, max_retries=3):
+# Keep-alive session for REST calls made without the python-binance client
+_http = None
+
+def _http_session():
+    global _http
+    if _http is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE))
+        session.headers["Connection"] = "keep-alive"
+        _http = session
+    return _http
+
+# requests errors subclass OSError, so timeouts and HTTP errors are retried; a malformed
+# payload is not, since asking again returns the same thing
+@safe_execute(default_return=None, max_retries=3, retry_on=TRANSIENT_ERRORS)
+def get_validated_price(symbol):
+    cached = _cached_price(symbol)
+    if cached is not None:
+        return cached
+    if client is not None:
+        ticker = client.get_symbol_ticker(symbol=symbol)
+        price = float(ticker['price'])
+        logger.info("✅ ACTUAL BINANCE PRICE: %s = %s", symbol, price)
+        return _remember_price(symbol, price)
+    response = _http_session().get(f"{BINANCE_REST_URL}/ticker/price", params={"symbol": symbol}, timeout=10)
+    response.raise_for_status()
+    price = float(response.json()['price'])
+    logger.info("✅ DIRECT API PRICE: %s = %s", symbol, price)
+    return _remember_price(symbol, price)
+
+async def _fetch_all_prices_async(session, symbols):
+    try:
+        params = {"symbols": json.dumps(list(symbols), separators=(",", ":"))}
+        async with session.get(f"{BINANCE_REST_URL}/ticker/price", params=params) as response:
+            response.raise_for_status()
+            data = await response.json()
+        for item in data:
+            _remember_price(item["symbol"], float(item["price"]))
+        logger.debug("Batch price refresh: %d symbols", len(data))
+    except Exception as e:
+        logger.warning(f"⚠️ Batch price refresh failed: {e}")
+
+# In-flight batch refresh; symbols that miss the cache together share one request
+_price_refresh_task = None
+
+async def refresh_all_prices_async(session):
+    """Fill _price_cache for every traded symbol with a single /ticker/price call"""
+    global _price_refresh_task
+    if _price_refresh_task is None or _price_refresh_task.done():
+        symbols = _kline_stream.symbols if _kline_stream is not None else SYMBOLS
+        _price_refresh_task = asyncio.ensure_future(_fetch_all_prices_async(session, symbols))
+    await asyncio.shield(_price_refresh_task)
+
+async def get_validated_price_async(session, symbol, max_retries=3):
+    cached = _cached_price(symbol)
+    if cached is not None:
+        return cached
+    await refresh_all_prices_async(session)
+    cached = _cached_price(symbol)
+    if cached is not None:
+        return cached
     for attempt in range(max_retries):
         try:
-            if client is not None:
-                ticker = client.get_symbol_ticker(symbol=symbol)
-                price = float(ticker['price'])
-                logger.info(f"✅ ACTUAL BINANCE PRICE: {symbol} = {price}")
-                return price
-            else:
-                import requests
-                if USE_TESTNET:
-                    url = "https://testnet.binance.vision/api/v3/ticker/price"
-                else:
-                    url = "https://api.binance.com/api/v3/ticker/price"
-                
-                response = requests.get(url, params={"symbol": symbol}, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
+            async with session.get(f"{BINANCE_REST_URL}/ticker/price", params={"symbol": symbol}) as response:
+                if response.status == 200:
+                    data = await response.json()
                     price = float(data['price'])
-                    logger.info(f"✅ DIRECT API PRICE: {symbol} = {price}")
-                    return price
-                
+                    logger.info("✅ ACTUAL BINANCE PRICE: %s = %s", symbol, price)
+                    return _remember_price(symbol, price)
         except Exception as e:
             logger.warning(f"Attempt {attempt+1}: Error getting actual price for {symbol}: {e}")
             if attempt < max_retries - 1:
-                time.sleep(1)
+                await asyncio.sleep(1)
     
     logger.error(f"❌ Failed to get ACTUAL price for {symbol} after {max_retries} attempts")
     return None
 
+class KlineRing:
+    """Fixed-size kline store backed by one preallocated float64 array.
+
+    Every bar is written twice (slot and slot + maxlen), so the newest `count`
+    bars are always one contiguous slice and reads need no np.roll/concatenate.
+    """
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self._buf = np.zeros((2 * maxlen, len(KLINE_COLUMNS)), dtype=np.float64)
+        self._head = 0   # next slot to write
+        self._count = 0
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, bar):
+        """Append a bar, or overwrite the newest one if it has the same open time"""
+        n = self.maxlen
+        if self._count and self._buf[self._head - 1 + n, 0] == bar[0]:
+            slot = (self._head - 1) % n
+        else:
+            slot = self._head
+            self._head = (self._head + 1) % n
+            self._count = min(self._count + 1, n)
+        self._buf[slot] = bar
+        self._buf[slot + n] = bar
+
+    def view(self):
+        """Read-only view of the stored bars, oldest first; only valid until the next push"""
+        end = self._head + self.maxlen
+        v = self._buf[end - self._count:end]
+        v.flags.writeable = False
+        return v
+
+# Live market data: one combined websocket for all symbols
+# Stream messages arrive for every trade on every symbol; orjson parses them several times faster
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+class KlineStream:
+    """Keeps the last `maxlen` klines and the latest price per symbol, pushed by Binance"""
+
+    def __init__(self, symbols, interval=KLINE_INTERVAL, maxlen=KLINE_LIMIT):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.maxlen = maxlen
+        self._klines = {symbol: KlineRing(maxlen) for symbol in self.symbols}
+        self._last_price = {}
+        self._wake = {symbol: asyncio.Event() for symbol in self.symbols}
+        self._wake_price = {}
+
+    @property
+    def url(self):
+        streams = "/".join(f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols)
+        return f"{BINANCE_WS_URL}?streams={streams}"
+
+    async def backfill(self, session):
+        await asyncio.gather(*(self.backfill_symbol(session, symbol) for symbol in self.symbols))
+
+    async def backfill_symbol(self, session, symbol):
+        """Reload one symbol's ring buffer from REST klines"""
+        try:
+            raw = await _fetch_klines_raw_async(session, symbol, self.interval, self.maxlen)
+            bars = self._klines[symbol]
+            bars.clear()
+            for k in raw:
+                bars.push((k[0], _parse_kline_value(k[1]), _parse_kline_value(k[2]),
+                           _parse_kline_value(k[3]), _parse_kline_value(k[4]),
+                           _parse_kline_value(k[5]), k[6]))
+            if len(bars):
+                self._last_price[symbol] = float(bars.view()[-1, 4])
+            logger.info(f"✅ Backfilled {len(bars)} klines for {symbol}")
+        except Exception as e:
+            logger.error(f"❌ Kline backfill failed for {symbol}: {e}")
+
+    def _on_message(self, raw_msg):
+        k = _loads(raw_msg)["data"]["k"]
+        symbol = k["s"]
+        bars = self._klines.get(symbol)
+        if bars is None:
+            return
+        bar = (k["t"], _parse_kline_value(k["o"]), _parse_kline_value(k["h"]),
+               _parse_kline_value(k["l"]), _parse_kline_value(k["c"]),
+               _parse_kline_value(k["v"]), k["T"])
+        bars.push(bar)
+        self._last_price[symbol] = bar[4]
+
+        ref = self._wake_price.get(symbol)
+        if k["x"] or not ref or abs(bar[4] - ref) / ref >= WAKE_PRICE_MOVE_PERCENT:
+            self._wake[symbol].set()
+
+    async def wait_for_update(self, symbol, timeout):
+        """Sleep until a candle closes, price moves sharply, or `timeout` seconds pass"""
+        event = self._wake[symbol]
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+        self._wake_price[symbol] = self._last_price.get(symbol)
+
+    async def run(self, session):
+        while True:
+            try:
+                async with session.ws_connect(self.url, heartbeat=30) as ws:
+                    logger.info(f"🔌 Kline stream connected for {len(self.symbols)} symbols")
+                    while True:
+                        # Heartbeat pongs only prove the socket is open; data silence means it stalled
+                        try:
+                            msg = await ws.receive(timeout=STREAM_STALE_SECONDS)
+                        except asyncio.TimeoutError:
+                            logger.warning(f"⚠️ No kline data for {STREAM_STALE_SECONDS}s, forcing reconnect")
+                            break
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            try:
+                                self._on_message(msg.data)
+                            except Exception as e:
+                                logger.debug("Error parsing kline stream message: %s", e)
+                        elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING,
+                                          aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+                logger.warning("⚠️ Kline stream disconnected, reconnecting...")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Kline stream error: {e}")
+            # Nothing is pushed while disconnected; let price lookups fall back to REST until backfill
+            self._last_price.clear()
+            await asyncio.sleep(5)
+            await self.backfill(session)
+
+    def klines(self, symbol):
+        """The buffered bars as Klines column arrays, without building a DataFrame"""
+        bars = self._klines.get(symbol)
+        if not bars:
+            return as_klines(None)
+        # Column-major copy, so every column comes out as a contiguous array
+        return Klines(*np.array(bars.view(), order="F").T)
+
+    def last_price(self, symbol):
+        return self._last_price.get(symbol)
+
+# symbol -> {"step": LOT_SIZE stepSize, "decimals": digits in stepSize}; filled once by load_symbol_meta
+SYMBOL_META = {}
+
+def load_symbol_meta(symbols):
+    """Cache each symbol's LOT_SIZE step from a single exchangeInfo call"""
+    if client is None:
+        return
+    try:
+        info = client.get_exchange_info()
+    except Exception as e:
+        logger.warning(f"⚠️ exchangeInfo unavailable, order quantities fall back to 6 decimals: {e}")
+        return
+    wanted = set(symbols)
+    for entry in info.get("symbols", []):
+        if entry.get("symbol") not in wanted:
+            continue
+        for f in entry.get("filters", []):
+            if f.get("filterType") == "LOT_SIZE":
+                step = float(f["stepSize"])
+                if step > 0:
+                    SYMBOL_META[entry["symbol"]] = {"step": step, "decimals": max(0, round(-math.log10(step)))}
+                break
+    logger.info(f"✅ Loaded lot sizes for {len(SYMBOL_META)}/{len(wanted)} symbols")
+
+def _order_quantity(symbol, qty):
+    """Order quantity floored to the symbol's step size, formatted without float noise"""
+    meta = SYMBOL_META.get(symbol)
+    if meta is None:
+        return round(qty, 6)
+    step = meta["step"]
+    # The epsilon keeps exact multiples (0.3 / 0.1 = 2.9999999999999996) from losing a step
+    return f"{math.floor(qty / step + 1e-9) * step:.{meta['decimals']}f}"
+
 # Enhanced Orders
-@safe_execute(default_return=False)
+@safe_execute(default_return=False, max_retries=1)
 def place_order(side, symbol, qty):
     if DRY_RUN or client is None:
         logger.info(f"[DRY-RUN] {side.upper()} {qty:.6f} {symbol}")
@@ -795,7 +1455,7 @@ def place_order(side, symbol, qty):
         else:
             order_side = "BUY" if side == "long" else "SELL"
         
-        result = client.create_order(symbol=symbol, side=order_side, type="MARKET", quantity=round(qty, 6))
+        result = client.create_order(symbol=symbol, side=order_side, type="MARKET", quantity=_order_quantity(symbol, qty))
         logger.info(f"Successfully placed {order_side} order for {qty:.6f} {symbol}")
         return True
     except Exception as e:
@@ -832,191 +1492,143 @@ def execute_trade_with_validation(side, symbol, quantity, price=None):
 
 # PROPER SL LOGIC (EMA + ATR BASED)
 def calculate_proper_sl(symbol, entry_price, side, df):
+    """Wider of the EMA50 and ATR stops, capped at 3% from entry; `sign` mirrors it for shorts"""
+    sign = 1 if side == "long" else -1
     try:
-        if df.empty or len(df) < 30:
+        bars = as_klines(df)
+        if len(bars.close) < 30:
             logger.warning(f"Insufficient data for {symbol}, using fallback SL")
-            if side == "long":
-                return entry_price * 0.99
-            else:
-                return entry_price * 1.01
+            return entry_price * (1 - sign * SL_FALLBACK_PERCENT)
         
-        ema_50 = df['close'].ewm(span=50).mean().iloc[-1]
-        atr_value = atr(df).iloc[-1]
+        ema_50, atr_value = _latest_sl_inputs(symbol, bars)
         
-        if side == "long":
-            sl_ema = ema_50
-            sl_atr = entry_price - (atr_value * ATR_SL_MULT)
-            proper_sl = min(sl_ema, sl_atr)
-            
-            max_sl_distance = entry_price * 0.03
-            if entry_price - proper_sl > max_sl_distance:
-                proper_sl = entry_price - max_sl_distance
-            
-            logger.info(f"📊 LONG SL Calculated for {symbol}: EMA50={ema_50:.4f}, ATR_SL={sl_atr:.4f}, Final_SL={proper_sl:.4f}")
-            
-        else:
-            sl_ema = ema_50
-            sl_atr = entry_price + (atr_value * ATR_SL_MULT)
-            proper_sl = max(sl_ema, sl_atr)
-            
-            max_sl_distance = entry_price * 0.03
-            if proper_sl - entry_price > max_sl_distance:
-                proper_sl = entry_price + max_sl_distance
-            
-            logger.info(f"📊 SHORT SL Calculated for {symbol}: EMA50={ema_50:.4f}, ATR_SL={sl_atr:.4f}, Final_SL={proper_sl:.4f}")
+        sl_ema = ema_50
+        sl_atr = entry_price - sign * (atr_value * ATR_SL_MULT)
+        # min() for longs, max() for shorts
+        proper_sl = sl_ema if (sl_ema - sl_atr) * sign <= 0 else sl_atr
+        
+        max_sl_distance = entry_price * 0.03
+        if (entry_price - proper_sl) * sign > max_sl_distance:
+            proper_sl = entry_price - sign * max_sl_distance
         
+        logger.info(f"📊 {side.upper()} SL Calculated for {symbol}: EMA50={ema_50:.4f}, ATR_SL={sl_atr:.4f}, Final_SL={proper_sl:.4f}")
         return proper_sl
         
     except Exception as e:
         logger.error(f"Error calculating proper SL: {e}")
-        if side == "long":
-            return entry_price * 0.99
-        else:
-            return entry_price * 1.01
+        return entry_price * (1 - sign * SL_FALLBACK_PERCENT)
+
+def _new_tp_targets(tp_prices, total_quantity):
+    """Fresh tp_targets for an entry: one record per TP_CLOSE_LEVELS row, prices in the same order"""
+    return {key: {"price": price, "hit": False, "level": level, "quantity": total_quantity * close_percent, "closed": False}
+            for level, ((key, close_percent), price) in enumerate(zip(TP_CLOSE_LEVELS, tp_prices), 1)}
 
 # MULTI-LEVEL TP + PROFIT DISTRIBUTION SYSTEM
-def set_multi_tp_profit_distribution(symbol, entry_price, side, df, total_quantity):
+def set_multi_tp_profit_distribution(symbol, entry_price, side, df, total_quantity, initial_sl=None, state=None):
+    """TP prices for a new entry; `initial_sl`/`state` let the caller reuse values it already holds"""
     try:
-        initial_sl = calculate_proper_sl(symbol, entry_price, side, df)
+        if initial_sl is None:
+            initial_sl = calculate_proper_sl(symbol, entry_price, side, df)
         
-        if side == "long":
-            tp1_price = entry_price * (1 + TP1_PERCENT)
-            tp2_price = entry_price * (1 + TP2_PERCENT) 
-            tp3_price = entry_price * (1 + TP3_PERCENT)
-            
-        else:
-            tp1_price = entry_price * (1 - TP1_PERCENT)
-            tp2_price = entry_price * (1 - TP2_PERCENT)
-            tp3_price = entry_price * (1 - TP3_PERCENT)
+        sign = 1 if side == "long" else -1
+        tp1_price = entry_price * (1 + sign * TP1_PERCENT)
+        tp2_price = entry_price * (1 + sign * TP2_PERCENT)
+        tp3_price = entry_price * (1 + sign * TP3_PERCENT)
         
-        tp1_quantity = total_quantity * TP1_CLOSE_PERCENT
-        tp2_quantity = total_quantity * TP2_CLOSE_PERCENT
-        tp3_quantity = total_quantity * TP3_CLOSE_PERCENT
         trailing_quantity = total_quantity * TRAILING_PERCENT
         
-        state = load_state()
+        if state is None:
+            state = load_state()
         if symbol in state.get("open_trades", {}):
-            state["open_trades"][symbol]["tp_targets"] = {
-                "tp1": {"price": f"{tp1_price:.4f}", "hit": False, "level": 1, "quantity": tp1_quantity, "closed": False},
-                "tp2": {"price": f"{tp2_price:.4f}", "hit": False, "level": 2, "quantity": tp2_quantity, "closed": False}, 
-                "tp3": {"price": f"{tp3_price:.4f}", "hit": False, "level": 3, "quantity": tp3_quantity, "closed": False}
-            }
+            tp_targets = _new_tp_targets((tp1_price, tp2_price, tp3_price), total_quantity)
+            tp1_quantity, tp2_quantity, tp3_quantity = (t["quantity"] for t in tp_targets.values())
+            state["open_trades"][symbol]["tp_targets"] = tp_targets
             
             state["open_trades"][symbol]["remaining_quantity"] = total_quantity
             state["open_trades"][symbol]["trailing_quantity"] = trailing_quantity
             
-            state["open_trades"][symbol]["sl"] = f"{initial_sl:.4f}"
-            state["open_trades"][symbol]["tp1"] = f"{tp1_price:.4f}"
-            state["open_trades"][symbol]["tp2"] = f"{tp2_price:.4f}" 
-            state["open_trades"][symbol]["tp3"] = f"{tp3_price:.4f}"
+            state["open_trades"][symbol]["sl"] = initial_sl
+            state["open_trades"][symbol]["tp1"] = tp1_price
+            state["open_trades"][symbol]["tp2"] = tp2_price
+            state["open_trades"][symbol]["tp3"] = tp3_price
             
             state["open_trades"][symbol]["trailing_active"] = False
             state["open_trades"][symbol]["trailing_triggered"] = False
-            state["open_trades"][symbol]["highest_price"] = f"{entry_price:.4f}" if side == "long" else f"{entry_price:.4f}"
-            state["open_trades"][symbol]["lowest_price"] = f"{entry_price:.4f}" if side == "short" else f"{entry_price:.4f}"
+            state["open_trades"][symbol]["extreme_price"] = entry_price
             state["open_trades"][symbol]["trailing_distance_percent"] = TRAILING_DISTANCE_PERCENT
             
             save_state(state)
-            logger.info(f"✅ Multi-TP with Profit Distribution set for {symbol}")
-            logger.info(f"   TP1: {tp1_price:.4f} ({TP1_CLOSE_PERCENT*100}% - {tp1_quantity:.6f})")
-            logger.info(f"   TP2: {tp2_price:.4f} ({TP2_CLOSE_PERCENT*100}% - {tp2_quantity:.6f})")
-            logger.info(f"   TP3: {tp3_price:.4f} ({TP3_CLOSE_PERCENT*100}% - {tp3_quantity:.6f})")
-            logger.info(f"   Trailing: {TRAILING_PERCENT*100}% - {trailing_quantity:.6f}")
-            logger.info(f"✅ PROPER SL set: {initial_sl:.4f} (EMA50 + ATR based)")
+            logger.info(f"✅ Multi-TP with Profit Distribution set for {symbol}\n"
+                        f"   TP1: {tp1_price:.4f} ({TP1_CLOSE_PERCENT*100}% - {tp1_quantity:.6f})\n"
+                        f"   TP2: {tp2_price:.4f} ({TP2_CLOSE_PERCENT*100}% - {tp2_quantity:.6f})\n"
+                        f"   TP3: {tp3_price:.4f} ({TP3_CLOSE_PERCENT*100}% - {tp3_quantity:.6f})\n"
+                        f"   Trailing: {TRAILING_PERCENT*100}% - {trailing_quantity:.6f}\n"
+                        f"✅ PROPER SL set: {initial_sl:.4f} (EMA50 + ATR based)")
         
-        return f"{tp1_price:.4f}", f"{tp2_price:.4f}", f"{tp3_price:.4f}"
+        return tp1_price, tp2_price, tp3_price
     except Exception as e:
         logger.error(f"Error setting multi-TP with profit distribution: {e}")
         return None, None, None
 
-def check_tp_targets_with_partial_close(symbol, current_price, trade_info):
+def _usdt_value(value):
+    """Float from a state P&L field; older state files hold strings like '+1.25 USDT'"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value or "").replace("+", "").replace("USDT", "").strip()
+    return float(text) if text else 0.0
+
+def check_tp_targets_with_partial_close(symbol, current_price, trade_info, state=None):
+    """Partially close at the first un-hit TP level once price reaches it, rolling the SL up behind it"""
     try:
-        side = trade_info.get("side", "long")
+        sign = _trade_sign(trade_info)
         entry_price = float(trade_info.get("entry_price", 0))
         tp_targets = trade_info.get("tp_targets", {})
         remaining_quantity = float(trade_info.get("remaining_quantity", 0))
-        total_quantity = float(trade_info.get("total_quantity", 0))
         
-        state = load_state()
+        if state is None:
+            state = load_state()
         if symbol not in state.get("open_trades", {}):
             return False
         
         trade_data = state["open_trades"][symbol]
-        updated = False
-        
-        if not tp_targets.get("tp1", {}).get("hit", False):
-            tp1_price = float(tp_targets["tp1"]["price"])
-            if (side == "long" and current_price >= tp1_price) or \
-               (side == "short" and current_price <= tp1_price):
-                tp1_quantity = float(tp_targets["tp1"]["quantity"])
-                if execute_trade_with_validation("sell" if side == "long" else "buy", symbol, tp1_quantity, current_price):
-                    if side == "long":
-                        tp1_profit = (current_price - entry_price) * tp1_quantity
-                    else:
-                        tp1_profit = (entry_price - current_price) * tp1_quantity
-                    
-                    trade_data["tp_targets"]["tp1"]["hit"] = True
-                    trade_data["tp_targets"]["tp1"]["closed"] = True
-                    trade_data["remaining_quantity"] = f"{remaining_quantity - tp1_quantity:.6f}"
-                    trade_data["sl"] = f"{entry_price:.4f}"
-                    trade_data["partial_profit"] = f"+{tp1_profit:.2f} USDT"
-                    updated = True
-                    
-                    logger.info(f"🎯 TP1 Hit for {symbol}! Closed {tp1_quantity:.6f} ({TP1_CLOSE_PERCENT*100}%)")
-                    logger.info(f"💰 Partial Profit: {tp1_profit:.2f} USDT - SL moved to break-even")
-        
-        elif not tp_targets.get("tp2", {}).get("hit", False) and tp_targets.get("tp1", {}).get("hit", False):
-            tp2_price = float(tp_targets["tp2"]["price"])
-            if (side == "long" and current_price >= tp2_price) or \
-               (side == "short" and current_price <= tp2_price):
-                tp2_quantity = float(tp_targets["tp2"]["quantity"])
-                if execute_trade_with_validation("sell" if side == "long" else "buy", symbol, tp2_quantity, current_price):
-                    if side == "long":
-                        tp2_profit = (current_price - entry_price) * tp2_quantity
-                    else:
-                        tp2_profit = (entry_price - current_price) * tp2_quantity
-                    
-                    trade_data["tp_targets"]["tp2"]["hit"] = True
-                    trade_data["tp_targets"]["tp2"]["closed"] = True
-                    trade_data["remaining_quantity"] = f"{remaining_quantity - tp2_quantity:.6f}"
-                    tp1_price = float(tp_targets["tp1"]["price"])
-                    trade_data["sl"] = f"{tp1_price:.4f}"
-                    current_partial = float(trade_data.get("partial_profit", "0").replace("+", "").replace(" USDT", ""))
-                    trade_data["partial_profit"] = f"+{current_partial + tp2_profit:.2f} USDT"
-                    updated = True
-                    
-                    logger.info(f"🎯 TP2 Hit for {symbol}! Closed {tp2_quantity:.6f} ({TP2_CLOSE_PERCENT*100}%)")
-                    logger.info(f"💰 Additional Profit: {tp2_profit:.2f} USDT - SL moved to TP1")
+        prev_key = None
         
-        elif not tp_targets.get("tp3", {}).get("hit", False) and tp_targets.get("tp2", {}).get("hit", False):
-            tp3_price = float(tp_targets["tp3"]["price"])
-            if (side == "long" and current_price >= tp3_price) or \
-               (side == "short" and current_price <= tp3_price):
-                tp3_quantity = float(tp_targets["tp3"]["quantity"])
-                if execute_trade_with_validation("sell" if side == "long" else "buy", symbol, tp3_quantity, current_price):
-                    if side == "long":
-                        tp3_profit = (current_price - entry_price) * tp3_quantity
-                    else:
-                        tp3_profit = (entry_price - current_price) * tp3_quantity
-                    
-                    trade_data["tp_targets"]["tp3"]["hit"] = True
-                    trade_data["tp_targets"]["tp3"]["closed"] = True
-                    trade_data["remaining_quantity"] = f"{remaining_quantity - tp3_quantity:.6f}"
-                    tp2_price = float(tp_targets["tp2"]["price"])
-                    trade_data["sl"] = f"{tp2_price:.4f}"
-                    trade_data["trailing_active"] = True
-                    current_partial = float(trade_data.get("partial_profit", "0").replace("+", "").replace(" USDT", ""))
-                    trade_data["partial_profit"] = f"+{current_partial + tp3_profit:.2f} USDT"
-                    updated = True
-                    
-                    logger.info(f"🎯 TP3 Hit for {symbol}! Closed {tp3_quantity:.6f} ({TP3_CLOSE_PERCENT*100}%)")
-                    logger.info(f"💰 Additional Profit: {tp3_profit:.2f} USDT")
-                    logger.info(f"🚀 Trailing stop ACTIVATED for remaining {trade_data['remaining_quantity']} {symbol}")
-        
-        if updated:
+        for key, close_percent in TP_CLOSE_LEVELS:
+            if tp_targets.get(key, {}).get("hit", False):
+                prev_key = key
+                continue
+            
+            # Levels fill in order, so only the first un-hit one is checked
+            tp_price = float(tp_targets[key]["price"])
+            if (current_price - tp_price) * sign < 0:
+                return False
+            tp_quantity = float(tp_targets[key]["quantity"])
+            if not execute_trade_with_validation("sell" if sign > 0 else "buy", symbol, tp_quantity, current_price):
+                return False
+            
+            tp_profit = (current_price - entry_price) * sign * tp_quantity
+            target = trade_data["tp_targets"][key]
+            target["hit"] = True
+            target["closed"] = True
+            trade_data["remaining_quantity"] = remaining_quantity - tp_quantity
+            # SL moves to break-even after TP1, then to the previous TP level
+            new_sl = entry_price if prev_key is None else float(tp_targets[prev_key]["price"])
+            trade_data["sl"] = new_sl
+            trade_data["partial_profit"] = _usdt_value(trade_data.get("partial_profit")) + tp_profit
+            
+            logger.info(f"🎯 {key.upper()} Hit for {symbol}! Closed {tp_quantity:.6f} ({close_percent*100}%)")
+            if prev_key is None:
+                logger.info(f"💰 Partial Profit: {tp_profit:.2f} USDT - SL moved to break-even")
+            else:
+                logger.info(f"💰 Additional Profit: {tp_profit:.2f} USDT - SL moved to {prev_key.upper()}")
+            if key == TP_CLOSE_LEVELS[-1][0]:
+                trade_data["trailing_active"] = True
+                logger.info(f"🚀 Trailing stop ACTIVATED for remaining {trade_data['remaining_quantity']:.6f} {symbol}")
+            
             save_state(state)
+            return True
         
-        return updated
+        return False
     except Exception as e:
         logger.error(f"Error checking TP targets with partial close: {e}")
         return False
@@ -1028,7 +1640,7 @@ def log_partial_close(symbol, side, entry_price, exit_price, quantity, trade_num
             "Symbol": symbol.replace('USDT',''),
             "Side": side.upper(),
             "Type": f"{symbol} {side.upper()} - {tp_level}",
-            "Date/Time": datetime.now().strftime("%b %d, %Y, %H:%M"),
+            "Date/Time": _now_str(),
             "Signal": f"Partial Close ({tp_level})",
             "Price": f"{exit_price:.8f}",
             "Position size": f"{quantity:.6f} ({round(quantity*exit_price,2):.2f} USDT)",
@@ -1047,73 +1659,85 @@ def log_partial_close(symbol, side, entry_price, exit_price, quantity, trade_num
     except Exception as e:
         logger.error(f"Error logging partial close: {e}")
 
-def update_trailing_stop(symbol, current_price, trade_info):
+def update_trailing_stop(symbol, current_price, trade_info, state=None):
     try:
         if not trade_info.get("trailing_active", False):
             return False
         
-        side = trade_info.get("side", "long")
-        trailing_distance_percent = trade_info.get("trailing_distance_percent", TRAILING_DISTANCE_PERCENT)
-        highest_price = float(trade_info.get("highest_price", current_price))
-        lowest_price = float(trade_info.get("lowest_price", current_price))
+        sign = _trade_sign(trade_info)
+        trail_mul = 1 - sign * float(trade_info.get("trailing_distance_percent", TRAILING_DISTANCE_PERCENT))
+        extreme_price = trade_info.get("extreme_price")
+        if extreme_price is None:
+            # Trades opened before extreme_price kept separate highest/lowest fields
+            extreme_price = trade_info.get("highest_price" if sign > 0 else "lowest_price", current_price)
+        extreme_price = float(extreme_price)
         
-        state = load_state()
+        if state is None:
+            state = load_state()
         if symbol not in state.get("open_trades", {}):
             return False
         
         trade_data = state["open_trades"][symbol]
         updated = False
+        sl_moved = False
         
-        if side == "long":
-            if current_price > highest_price:
-                trade_data["highest_price"] = f"{current_price:.4f}"
-                updated = True
-                highest_price = current_price
-            
-            new_trailing_stop = highest_price * (1 - trailing_distance_percent)
-            current_sl = float(trade_data.get("sl", 0))
-            
-            if new_trailing_stop > current_sl:
-                trade_data["sl"] = f"{new_trailing_stop:.4f}"
-                updated = True
-                logger.info(f"📈 Trailing SL updated for {symbol}: {new_trailing_stop:.4f} (Current: {current_price:.4f})")
+        # Long tracks the highest price, short the lowest; `sign` flips every comparison
+        if (current_price - extreme_price) * sign > 0:
+            trade_data["extreme_price"] = current_price
+            updated = True
+            extreme_price = current_price
         
-        else:
-            if current_price < lowest_price:
-                trade_data["lowest_price"] = f"{current_price:.4f}"
-                updated = True
-                lowest_price = current_price
-            
-            new_trailing_stop = lowest_price * (1 + trailing_distance_percent)
-            current_sl = float(trade_data.get("sl", 0))
-            
-            if new_trailing_stop < current_sl:
-                trade_data["sl"] = f"{new_trailing_stop:.4f}"
-                updated = True
-                logger.info(f"📉 Trailing SL updated for {symbol}: {new_trailing_stop:.4f} (Current: {current_price:.4f})")
+        new_trailing_stop = extreme_price * trail_mul
+        current_sl = float(trade_data.get("sl", 0))
         
-        if updated:
+        if (new_trailing_stop - current_sl) * sign > 0:
+            trade_data["sl"] = new_trailing_stop
+            updated = sl_moved = True
+            logger.info("%s Trailing SL updated for %s: %.4f (Current: %.4f)",
+                        '📈' if sign > 0 else '📉', symbol, new_trailing_stop, current_price)
+        
+        if sl_moved:
+            # A deferred write can be dropped by any other save; the ratchet must not be lost
             save_state(state)
+        elif updated:
+            # New extremes arrive tick after tick; coalesce them into one write
+            save_state(state, defer=True)
         
         return updated
     except Exception as e:
         logger.error(f"Error updating trailing stop: {e}")
         return False
 
-def check_sl_tp(symbol, current_price, trade_info):
+# Derived from the stored trade on every use, never persisted: a copy in state.json
+# would go stale as soon as side or tp_targets were edited
+def _trade_sign(trade_info):
+    """+1 for long, -1 for short"""
+    return 1 if trade_info.get("side", "long") == "long" else -1
+
+def _tp_levels(tp_targets):
+    """Ordered (level, price) pairs"""
+    return [[key, float(tp_targets[key]["price"])] for key in ("tp1", "tp2", "tp3")
+            if tp_targets.get(key, {}).get("price") is not None]
+
+def _next_tp_price(trade_info):
+    tp_targets = trade_info.get("tp_targets", {})
+    for key, price in _tp_levels(tp_targets):
+        if not tp_targets.get(key, {}).get("hit", False):
+            return price
+    return None
+
+def check_sl_tp(symbol, current_price, trade_info, state=None):
+    """SL exit, next TP partial close and trailing update; pass the caller's state to skip reloading it"""
     try:
         sl = trade_info.get("sl")
-        tp_targets = trade_info.get("tp_targets", {})
-        remaining_quantity = float(trade_info.get("remaining_quantity", 0))
-        
         if not sl:
             return False
         
-        sl_price = float(sl)
+        sign = _trade_sign(trade_info)
         side = trade_info.get("side", "long")
         
-        if (side == "long" and current_price <= sl_price) or \
-           (side == "short" and current_price >= sl_price):
+        if (current_price - float(sl)) * sign <= 0:
+            remaining_quantity = float(trade_info.get("remaining_quantity", 0))
             if remaining_quantity > 0:
                 logger.info(f"🛑 SL Hit for {symbol} {side.upper()} at {current_price}")
                 
@@ -1121,28 +1745,31 @@ def check_sl_tp(symbol, current_price, trade_info):
                                                symbol, remaining_quantity, current_price):
                     return "SL"
         
-        tp_hit = check_tp_targets_with_partial_close(symbol, current_price, trade_info)
-        if tp_hit:
-            return "TP_TARGET"
+        # Only touch state when the next TP level has actually been reached
+        next_tp = _next_tp_price(trade_info)
+        if next_tp is not None and (current_price - next_tp) * sign >= 0:
+            tp_hit = check_tp_targets_with_partial_close(symbol, current_price, trade_info, state)
+            if tp_hit:
+                return "TP_TARGET"
         
         if trade_info.get("trailing_active", False):
-            update_trailing_stop(symbol, current_price, trade_info)
+            update_trailing_stop(symbol, current_price, trade_info, state)
         
         return False
     except Exception as e:
         logger.error(f"❌ Error checking SL/TP for {symbol}: {e}")
         return False
 
-@safe_execute(default_return=1)
-def log_open(symbol, side, price, qty):
+@safe_execute(default_return=1, max_retries=1)
+def log_open(symbol, side, price, qty, state=None):
     try:
-        trade_num = next_trade_number()
+        trade_num = next_trade_number(state)
         row = {
             "Trade #": trade_num,
             "Symbol": symbol.replace('USDT',''),
             "Side": side.upper(),
             "Type": f"{symbol} {side.upper()}",
-            "Date/Time": datetime.now().strftime("%b %d, %Y, %H:%M"),
+            "Date/Time": _now_str(),
             "Signal": "Entry",
             "Price": f"{price:.8f}",
             "Position size": f"{TRADE_USDT:.2f} USDT",
@@ -1161,51 +1788,37 @@ def log_open(symbol, side, price, qty):
         logger.error(f"Error in log_open for {symbol}: {e}")
         return 1
 
-def _update_stats_from_pnl(side, pnl):
+def _update_stats_from_pnl(side, pnl, state=None):
+    """Bump win/loss counters; with `state` given the caller is responsible for saving it"""
     try:
-        st = load_state()
-        side = side.lower()
-        if "stats" not in st:
-            st["stats"] = {
-                "long": {"total": 0, "success": 0, "fail": 0},
-                "short": {"total": 0, "success": 0, "fail": 0}
-            }
-        if side not in ("long","short"):
-            side = "long" if str(side).lower().startswith("l") else "short"
+        st = load_state() if state is None else _ensure_state_keys(state)
+        side = str(side).lower()
+        if side not in ("long", "short"):
+            side = "long" if side.startswith("l") else "short"
         
-        st["stats"].setdefault(side, {"total":0,"success":0,"fail":0})
-        st["stats"][side]["total"] = st["stats"][side].get("total",0) + 1
+        counters = st["stats"][side]
+        counters["total"] += 1
+        outcome = "success" if pnl is not None and pnl > 0 else "fail"
+        counters[outcome] += 1
+        logger.debug("Updated stats: %s %s", side, outcome)
         
-        if pnl is not None and pnl > 0:
-            st["stats"][side]["success"] = st["stats"][side].get("success",0) + 1
-            logger.debug(f"Updated stats: {side} success")
-        else:
-            st["stats"][side]["fail"] = st["stats"][side].get("fail",0) + 1
-            logger.debug(f"Updated stats: {side} fail")
-        
-        save_state(st)
+        if state is None:
+            save_state(st)
     except Exception as e:
         logger.error(f"Error updating stats: {e}")
 
-@safe_execute(default_return=(0.0, 0.0))
-def log_close(symbol, side, entry_price, exit_price, qty, trade_num, reason="Manual"):
+def log_close(symbol, side, entry_price, exit_price, qty, trade_num, reason="Manual", state=None):
     try:
-        if side == "long":
-            pnl = (exit_price - entry_price) * qty
-        else:
-            pnl = (entry_price - exit_price) * qty
-            
-        pnl = round(pnl, 2)
+        sign = 1 if side == "long" else -1
+        pnl = round(sign * (exit_price - entry_price) * qty, 2)
         
         max_realistic_pnl = TRADE_USDT * 5
         if abs(pnl) > max_realistic_pnl:
             logger.warning(f"⚠️ Suspicious P&L for {symbol}: {pnl} USDT (trade: {TRADE_USDT} USDT)")
             pnl = max_realistic_pnl if pnl > 0 else -max_realistic_pnl
         
-        df = safe_read_trades()
         try:
-            existing = pd.to_numeric(df["Net P&L"].str.replace("[^0-9.-]","", regex=True), errors="coerce").dropna()
-            cumulative = existing.sum() + pnl if not existing.empty else pnl
+            cumulative = net_pnl_total() + pnl
         except Exception:
             cumulative = pnl
             
@@ -1214,7 +1827,7 @@ def log_close(symbol, side, entry_price, exit_price, qty, trade_num, reason="Man
             "Symbol": symbol.replace('USDT',''),
             "Side": side.upper(),
             "Type": f"{symbol} {side.upper()}",
-            "Date/Time": datetime.now().strftime("%b %d, %Y, %H:%M"),
+            "Date/Time": _now_str(),
             "Signal": f"Exit ({reason})",
             "Price": f"{exit_price:.8f}",
             "Position size": f"{qty:.6f} ({round(qty*exit_price,2):.2f} USDT)",
@@ -1229,7 +1842,7 @@ def log_close(symbol, side, entry_price, exit_price, qty, trade_num, reason="Man
             logger.info(f"✅ Logged CLOSE trade #{trade_num} for {symbol} {side} at {exit_price}, PnL: {pnl} ({reason})")
             
             try:
-                _update_stats_from_pnl(side, pnl)
+                _update_stats_from_pnl(side, pnl, state)
             except Exception as e:
                 logger.error(f"Error updating stats for trade close: {e}")
         else:
@@ -1246,7 +1859,7 @@ def calculate_quantity(price):
         if price <= 0:
             return 0
         quantity = TRADE_USDT / price
-        logger.debug(f"Calculated quantity: {quantity} for price {price}")
+        logger.debug("Calculated quantity: %s for price %s", quantity, price)
         return quantity
     except Exception as e:
         logger.error(f"Error calculating quantity: {e}")
@@ -1255,27 +1868,15 @@ def calculate_quantity(price):
 # ✅ FIXED: LOOSENED TRADING STRATEGY
 def check_trading_signal(df, symbol, current_price):
     try:
-        if df.empty or len(df) < 30:
-            logger.debug(f"Insufficient data for {symbol}")
+        bars = as_klines(df)
+        if len(bars.close) < 30:
+            logger.debug("Insufficient data for %s", symbol)
             return "HOLD"
         
-        ema_fast = df['close'].ewm(span=EMA_FAST).mean()
-        ema_slow = df['close'].ewm(span=EMA_SLOW).mean()
-        ema_mid = df['close'].ewm(span=EMA_MID).mean()
+        ema_fast_current, ema_slow_current, ema_mid_current, rsi_current, adx_current = _latest_indicators(symbol, bars)
         
-        rsi_val = rsi(df['close'])
-        plus_di, minus_di, adx_val = calculate_adx(df)
-        
-        ema_fast_current = ema_fast.iloc[-1]
-        ema_slow_current = ema_slow.iloc[-1]
-        ema_mid_current = ema_mid.iloc[-1]
-        rsi_current = rsi_val.iloc[-1]
-        adx_current = adx_val.iloc[-1]
-        
-        ema_fast_previous = ema_fast.iloc[-2] if len(ema_fast) > 1 else ema_fast_current
-        ema_slow_previous = ema_slow.iloc[-2] if len(ema_slow) > 1 else ema_slow_current
-        
-        logger.info(f"📊 {symbol} - Price: {current_price:.4f}, EMA_F: {ema_fast_current:.4f}, EMA_S: {ema_slow_current:.4f}, RSI: {rsi_current:.1f}, ADX: {adx_current:.1f}")
+        logger.info("📊 %s - Price: %.4f, EMA_F: %.4f, EMA_S: %.4f, RSI: %.1f, ADX: %.1f",
+                    symbol, current_price, ema_fast_current, ema_slow_current, rsi_current, adx_current)
         
         # ✅ LOOSENED BUY CONDITIONS
         buy_condition = (
@@ -1294,11 +1895,11 @@ def check_trading_signal(df, symbol, current_price):
         )
         
         if buy_condition:
-            logger.info(f"🎯 BUY SIGNAL for {symbol}")
+            logger.info("🎯 BUY SIGNAL for %s", symbol)
             return "BUY"
         
         elif sell_condition:
-            logger.info(f"🎯 SELL SIGNAL for {symbol}")
+            logger.info("🎯 SELL SIGNAL for %s", symbol)
             return "SELL"
         
         return "HOLD"
@@ -1307,172 +1908,237 @@ def check_trading_signal(df, symbol, current_price):
         logger.error(f"Error in check_trading_signal for {symbol}: {e}")
         return "HOLD"
 
+def _close_trade(state, symbol, trade, current_price, reason, execute=True):
+    """Close the remaining position, drop it from state and log the exit"""
+    side = trade.get("side", "")
+    remaining_quantity = float(trade.get("remaining_quantity", 0))
+    if execute:
+        execute_trade_with_validation("sell" if side == "long" else "buy", symbol, remaining_quantity, current_price)
+    state.get("open_trades", {}).pop(symbol, None)
+    log_close(symbol, side, float(trade.get("entry_price", 0)), current_price,
+              remaining_quantity, trade.get("trade_num", 0), reason, state=state)
+    save_state(state)
+
 def manage_open_trades(symbol, current_price, signal):
+    """Run SL/TP/trailing/signal exits; returns (state, trade_closed) so the caller can reuse state"""
+    state = None
     try:
         state = load_state()
         open_trades = state.get("open_trades", {})
         
         if symbol in open_trades:
             trade = open_trades[symbol]
-            entry_price = float(trade.get("entry_price", 0))
             side = trade.get("side", "")
-            trade_num = trade.get("trade_num", 0)
             remaining_quantity = float(trade.get("remaining_quantity", 0))
             
-            sl_tp_result = check_sl_tp(symbol, current_price, trade)
+            # Mutations land in `state` itself, so it stays current for strategy_tick
+            sl_tp_result = check_sl_tp(symbol, current_price, trade, state)
             if sl_tp_result:
                 if sl_tp_result == "SL" and remaining_quantity > 0:
                     logger.info(f"Closing remaining {remaining_quantity:.6f} {symbol} due to SL")
-                    execute_trade_with_validation("sell" if side == "long" else "buy", symbol, remaining_quantity, current_price)
-                    log_close(symbol, side, entry_price, current_price, remaining_quantity, trade_num, "SL")
-                    del open_trades[symbol]
-                    save_state(state)
-                return
-            
-            if trade.get("trailing_active", False):
-                update_trailing_stop(symbol, current_price, trade)
+                    # check_sl_tp already sent the closing order
+                    _close_trade(state, symbol, trade, current_price, "SL", execute=False)
+                    return state, True
+                return state, False
             
-            if side == "long":
-                if signal == "SELL" and remaining_quantity > 0:
-                    logger.info(f"Exiting remaining LONG position for {symbol} at {current_price} (Signal Change)")
-                    execute_trade_with_validation("sell", symbol, remaining_quantity, current_price)
-                    log_close(symbol, "long", entry_price, current_price, remaining_quantity, trade_num, "Signal")
-                    del open_trades[symbol]
-                    save_state(state)
-                    
-            elif side == "short":
-                if signal == "BUY" and remaining_quantity > 0:
-                    logger.info(f"Exiting remaining SHORT position for {symbol} at {current_price} (Signal Change)")
-                    execute_trade_with_validation("buy", symbol, remaining_quantity, current_price)
-                    log_close(symbol, "short", entry_price, current_price, remaining_quantity, trade_num, "Signal")
-                    del open_trades[symbol]
-                    save_state(state)
+            exit_signal = {"long": "SELL", "short": "BUY"}.get(side)
+            if exit_signal and signal == exit_signal and remaining_quantity > 0:
+                logger.info(f"Exiting remaining {side.upper()} position for {symbol} at {current_price} (Signal Change)")
+                _close_trade(state, symbol, trade, current_price, "Signal")
+                return state, True
                     
     except Exception as e:
         logger.error(f"Error managing open trades for {symbol}: {e}")
+    return state, False
+
+# ✅ FIXED: Strategy tick with LOOSENED CONDITIONS
+def strategy_tick(symbol, bars, current_price, consecutive_count, last_trade_time, current_time):
+    """Run one strategy evaluation; returns (consecutive_count, last_trade_time)"""
+    logger.info("💰 %s ACTUAL Price: %s", symbol, current_price)
+    
+    signal = check_trading_signal(bars, symbol, current_price)
+    state, _ = manage_open_trades(symbol, current_price, signal)
+    
+    if state is None:
+        state = load_state()
+    open_trades = state.get("open_trades", {})
+    
+    if symbol not in open_trades:
+        if signal != "HOLD":
+            consecutive_count += 1
+            logger.info("✅ Signal confirmation %d/%d for %s", consecutive_count, CONFIRMATION_REQUIRED, symbol)
+        else:
+            consecutive_count = 0
+        
+        if consecutive_count >= CONFIRMATION_REQUIRED and signal != "HOLD":
+            total_quantity = calculate_quantity(current_price)
+            if total_quantity > 0:
+                logger.info(f"🎯 ENTERING {signal} trade for {symbol} after {consecutive_count} confirmations")
+                
+                if execute_trade_with_validation("buy" if signal == "BUY" else "sell", 
+                                               symbol, total_quantity, current_price):
+                    trade_num = log_open(symbol, "long" if signal == "BUY" else "short", 
+                                       current_price, total_quantity, state=state)
+                    
+                    # One SL computation per entry, shared with the TP setup
+                    initial_sl = calculate_proper_sl(symbol, current_price, 
+                                                   "long" if signal == "BUY" else "short", bars)
+                    
+                    tp1, tp2, tp3 = set_multi_tp_profit_distribution(symbol, current_price, 
+                                                                    "long" if signal == "BUY" else "short", 
+                                                                    bars, total_quantity,
+                                                                    initial_sl=initial_sl, state=state)
+                    
+                    open_trades[symbol] = {
+                        "entry_price": current_price,
+                        "side": "long" if signal == "BUY" else "short",
+                        "total_quantity": total_quantity,
+                        "remaining_quantity": total_quantity,
+                        "trade_num": trade_num,
+                        "entry_time": time.strftime(ENTRY_TIME_FORMAT),
+                        "signal": signal,
+                        "sl": initial_sl,
+                        "tp1": tp1,
+                        "tp2": tp2,
+                        "tp3": tp3,
+                        "tp_targets": _new_tp_targets((tp1, tp2, tp3), total_quantity),
+                        "trailing_active": False,
+                        "trailing_triggered": False,
+                        "extreme_price": current_price,
+                        "trailing_distance_percent": TRAILING_DISTANCE_PERCENT,
+                        "trailing_quantity": total_quantity * TRAILING_PERCENT
+                    }
+                    save_state(state)
+                    
+                    consecutive_count = 0
+                    last_trade_time = current_time
+                    logger.info(f"⏳ Cooldown period started for {symbol}")
+    
+    logger.info("✅ %s - Signal: %s, Confirmations: %d/%d", symbol, signal, consecutive_count, CONFIRMATION_REQUIRED)
+    return consecutive_count, last_trade_time
 
-# ✅ FIXED: Strategy loop with LOOSENED CONDITIONS
-def strategy_loop(symbol):
+# ✅ Strategy loop: one coroutine per symbol, all sharing a single event loop + HTTP session
+async def strategy_loop_async(symbol, session, stream):
     logger.info(f"🚀 Starting LOOSENED strategy for {symbol}")
     
+    # Settled config, bound once per coroutine (after CLI overrides) instead of global lookups every tick
+    check_interval = CHECK_INTERVAL
+    trade_cooldown = TRADE_COOLDOWN
+    sleep = asyncio.sleep
+    now = time.time
+    klines = stream.klines
+    backfill_symbol = stream.backfill_symbol
+    last_price = stream.last_price
+    wait_for_update = stream.wait_for_update
+    
     consecutive_count = 0
     last_trade_time = None
     
     while True:
         try:
-            current_time = time.time()
+            current_time = now()
             
-            if last_trade_time and (current_time - last_trade_time) < TRADE_COOLDOWN:
-                time.sleep(CHECK_INTERVAL)
+            if last_trade_time and (current_time - last_trade_time) < trade_cooldown:
+                await sleep(check_interval)
                 continue
             
-            df = get_klines(symbol, '15m', 100)
-            if df.empty or len(df) < 30:
+            bars = klines(symbol)
+            if len(bars.close) < 30:
+                # Backfill failed or was cut short: refill the ring so later ticks read from it again
+                await backfill_symbol(session, symbol)
+                bars = klines(symbol)
+            if len(bars.close) < 30:
                 logger.warning(f"⚠️ Insufficient data for {symbol}, skipping...")
-                time.sleep(CHECK_INTERVAL)
+                await sleep(check_interval)
                 continue
             
-            current_price = get_validated_price(symbol)
+            current_price = last_price(symbol)
+            if current_price is None:
+                current_price = await get_validated_price_async(session, symbol)
             if current_price is None:
                 logger.warning(f"⚠️ Could not get price for {symbol}, skipping...")
-                time.sleep(CHECK_INTERVAL)
+                await sleep(check_interval)
                 continue
             
-            logger.info(f"💰 {symbol} ACTUAL Price: {current_price}")
-            
-            signal = check_trading_signal(df, symbol, current_price)
-            manage_open_trades(symbol, current_price, signal)
-            
-            state = load_state()
-            open_trades = state.get("open_trades", {})
-            
-            if symbol not in open_trades:
-                if signal != "HOLD":
-                    consecutive_count += 1
-                    logger.info(f"✅ Signal confirmation {consecutive_count}/{CONFIRMATION_REQUIRED} for {symbol}")
-                else:
-                    consecutive_count = 0
-                
-                if consecutive_count >= CONFIRMATION_REQUIRED and signal != "HOLD":
-                    total_quantity = calculate_quantity(current_price)
-                    if total_quantity > 0:
-                        logger.info(f"🎯 ENTERING {signal} trade for {symbol} after {consecutive_count} confirmations")
-                        
-                        if execute_trade_with_validation("buy" if signal == "BUY" else "sell", 
-                                                       symbol, total_quantity, current_price):
-                            trade_num = log_open(symbol, "long" if signal == "BUY" else "short", 
-                                               current_price, total_quantity)
-                            
-                            tp1, tp2, tp3 = set_multi_tp_profit_distribution(symbol, current_price, 
-                                                                            "long" if signal == "BUY" else "short", 
-                                                                            df, total_quantity)
-                            
-                            initial_sl = calculate_proper_sl(symbol, current_price, 
-                                                           "long" if signal == "BUY" else "short", df)
-                            
-                            open_trades[symbol] = {
-                                "entry_price": f"{current_price:.4f}",
-                                "side": "long" if signal == "BUY" else "short",
-                                "total_quantity": f"{total_quantity:.6f}",
-                                "remaining_quantity": f"{total_quantity:.6f}",
-                                "trade_num": trade_num,
-                                "entry_time": datetime.now().isoformat(),
-                                "signal": signal,
-                                "sl": f"{initial_sl:.4f}",
-                                "tp1": tp1,
-                                "tp2": tp2,
-                                "tp3": tp3,
-                                "tp_targets": {
-                                    "tp1": {"price": tp1, "hit": False, "level": 1, "quantity": total_quantity * TP1_CLOSE_PERCENT, "closed": False},
-                                    "tp2": {"price": tp2, "hit": False, "level": 2, "quantity": total_quantity * TP2_CLOSE_PERCENT, "closed": False},
-                                    "tp3": {"price": tp3, "hit": False, "level": 3, "quantity": total_quantity * TP3_CLOSE_PERCENT, "closed": False}
-                                },
-                                "trailing_active": False,
-                                "trailing_triggered": False,
-                                "highest_price": f"{current_price:.4f}" if signal == "BUY" else f"{current_price:.4f}",
-                                "lowest_price": f"{current_price:.4f}" if signal == "SELL" else f"{current_price:.4f}",
-                                "trailing_distance_percent": TRAILING_DISTANCE_PERCENT,
-                                "trailing_quantity": f"{total_quantity * TRAILING_PERCENT:.6f}"
-                            }
-                            save_state(state)
-                            
-                            consecutive_count = 0
-                            last_trade_time = current_time
-                            logger.info(f"⏳ Cooldown period started for {symbol}")
-            
-            logger.info(f"✅ {symbol} - Signal: {signal}, Confirmations: {consecutive_count}/{CONFIRMATION_REQUIRED}")
+            # Order placement and state/CSV I/O are blocking - keep them off the event loop
+            consecutive_count, last_trade_time = await asyncio.to_thread(
+                strategy_tick, symbol, bars, current_price, consecutive_count, last_trade_time, current_time
+            )
                 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error in strategy_loop for {symbol}: {e}")
         
-        time.sleep(CHECK_INTERVAL)
+        await wait_for_update(symbol, check_interval)
+
+async def run_strategies(symbols, max_workers=None):
+    """Run all symbol strategies (and the API server, if available) on one event loop"""
+    global _kline_stream
+    # asyncio.to_thread runs on the loop's default executor: size it for one tick per symbol
+    # plus the API's price lookups, instead of the interpreter's cpu_count-based default
+    workers = max_workers or min(32, len(symbols) + 4)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tick"))
+    connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, keepalive_timeout=HTTP_KEEPALIVE_SECONDS)
+    timeout = aiohttp.ClientTimeout(total=15)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        stream = KlineStream(symbols)
+        await stream.backfill(session)
+        _kline_stream = stream
+        tasks = [asyncio.create_task(stream.run(session))]
+        for symbol in symbols:
+            tasks.append(asyncio.create_task(strategy_loop_async(symbol, session, stream)))
+            logger.info(f"✅ Started LOOSENED bot for {symbol}")
+        logger.info(f"✅ Started {len(symbols)} trading bots with LOOSENED STRATEGY")
+        
+        try:
+            if FASTAPI_AVAILABLE:
+                logger.info(f"🌐 Starting FastAPI server on http://0.0.0.0:{PORT}")
+                logger.info("⏳ Trading Bot is now ACTIVE with LOOSENED STRATEGY...")
+                logger.info("📍 Use Ctrl+C to stop the bot")
+                # Served on the running (uvloop) loop; http="auto" picks httptools over h11 when installed
+                server = uvicorn.Server(uvicorn.Config(app, host="0.0.0.0", port=PORT, log_level="error"))
+                await server.serve()
+            else:
+                logger.info("🌐 FastAPI not available - running in console mode only")
+                logger.info("⏳ Trading Bot is now ACTIVE (console mode)...")
+                logger.info("📍 Use Ctrl+C to stop the bot")
+                await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
 # MAIN EXECUTION
-if __name__ == "__main__":
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Trading Bot")
+    parser.add_argument("--clear-history", action="store_true", help="Clear trades.csv and state.json then exit")
+    parser.add_argument("--symbol", type=str, help="Run bot for a single symbol")
+    parser.add_argument("--all", action="store_true", help="Run bot for all symbols in SYMBOLS list")
+    parser.add_argument("--confirmations", type=int, help="Override CONFIRMATION_REQUIRED")
+    parser.add_argument("--check", action="store_true", help="Run health checks and exit")
+    parser.add_argument("--max-workers", type=int, help="Worker threads for strategy ticks and blocking I/O")
+    parser.add_argument("--reset", action="store_true", help="Clear trade history and state")
+    parser.add_argument("--dry-run", action="store_true", help="Force dry run mode")
+    return parser.parse_args(argv)
+
+def run(args):
+    """Start the bot from parsed CLI args; returns the process exit code"""
+    global CONFIRMATION_REQUIRED, DRY_RUN
     try:
-        parser = argparse.ArgumentParser(description="Trading Bot")
-        parser.add_argument("--clear-history", action="store_true", help="Clear trades.csv and state.json then exit")
-        parser.add_argument("--symbol", type=str, help="Run bot for a single symbol")
-        parser.add_argument("--all", action="store_true", help="Run bot for all symbols in SYMBOLS list")
-        parser.add_argument("--confirmations", type=int, help="Override CONFIRMATION_REQUIRED")
-        parser.add_argument("--check", action="store_true", help="Run health checks and exit")
-        parser.add_argument("--max-workers", type=int, help="Max workers hint for multi-manager")
-        parser.add_argument("--reset", action="store_true", help="Clear trade history and state")
-        parser.add_argument("--dry-run", action="store_true", help="Force dry run mode")
-        args = parser.parse_args()
-
         logger.info("🤖 Trading Bot Starting with LOOSENED STRATEGY...")
 
         if args.clear_history or args.reset:
             reset_history()
             logger.info("🗑️ Trade history reset successfully")
             if args.clear_history:
-                exit(0)
+                return 0
 
         if args.check:
             ensure_files()
             logger.info("✅ Health checks passed")
-            exit(0)
+            return 0
 
         if args.confirmations is not None:
             CONFIRMATION_REQUIRED = max(1, int(args.confirmations))
@@ -1494,58 +2160,48 @@ if __name__ == "__main__":
         
         if not binance_connected:
             logger.error("🚫 CRITICAL: Cannot connect to Binance. Please check API keys and internet connection.")
-            exit(1)
+            return 1
+        load_symbol_meta(symbols_to_run)
 
         ensure_files()
+        warm_indicator_kernels()
         state = load_state()
         logger.info(f"📂 Loaded state with {len(state.get('open_trades', {}))} open trades")
 
-        logger.info("🚀 === Trading Bot Startup Summary ===")
-        logger.info(f"   LOOSENED STRATEGY: ✅ ENABLED")
-        logger.info(f"   EMA Fast: {EMA_FAST}, Slow: {EMA_SLOW}, Mid: {EMA_MID}")
-        logger.info(f"   RSI Long: {RSI_LONG}, Short: {RSI_SHORT}")
-        logger.info(f"   ADX Threshold: {ADX_THR}")
-        logger.info(f"   Confirmations Required: {CONFIRMATION_REQUIRED}")
-        logger.info(f"   Symbols: {len(symbols_to_run)}")
-        logger.info(f"   Dry Run: {DRY_RUN}")
+        # One record for the whole summary, so it stays together in the log
+        logger.info("🚀 === Trading Bot Startup Summary ===\n"
+                    "   LOOSENED STRATEGY: ✅ ENABLED\n"
+                    "   EMA Fast: %s, Slow: %s, Mid: %s\n"
+                    "   RSI Long: %s, Short: %s\n"
+                    "   ADX Threshold: %s\n"
+                    "   Confirmations Required: %s\n"
+                    "   Symbols: %d\n"
+                    "   Dry Run: %s",
+                    EMA_FAST, EMA_SLOW, EMA_MID, RSI_LONG, RSI_SHORT, ADX_THR,
+                    CONFIRMATION_REQUIRED, len(symbols_to_run), DRY_RUN)
+
+        if not AIOHTTP_AVAILABLE:
+            logger.error("🚫 CRITICAL: aiohttp is required to run the strategy loop.")
+            return 1
 
         try:
-            threads = []
-            for symbol in symbols_to_run:
-                t = threading.Thread(target=strategy_loop, args=(symbol,), daemon=True)
-                t.start()
-                threads.append(t)
-                logger.info(f"✅ Started LOOSENED bot for {symbol}")
-                time.sleep(1)
-            
-            logger.info(f"✅ Started {len(threads)} trading bots with LOOSENED STRATEGY")
+            if UVLOOP_AVAILABLE:
+                # Strategies, the kline stream and uvicorn all share this one loop
+                logger.info("⚡ Using uvloop event loop")
+                uvloop.run(run_strategies(symbols_to_run, args.max_workers))
+            else:
+                asyncio.run(run_strategies(symbols_to_run, args.max_workers))
+        except KeyboardInterrupt:
+            logger.info("👋 Bot stopped by user (Ctrl+C)")
         except Exception as e:
-            logger.error(f"❌ Error starting trading bots: {e}")
-            exit(1)
-
-        if FASTAPI_AVAILABLE:
-            logger.info(f"🌐 Starting FastAPI server on http://0.0.0.0:{PORT}")
-            logger.info("⏳ Trading Bot is now ACTIVE with LOOSENED STRATEGY...")
-            logger.info("📍 Use Ctrl+C to stop the bot")
-            
-            try:
-                uvicorn.run(app, host="0.0.0.0", port=PORT, log_level="error")
-            except KeyboardInterrupt:
-                logger.info("👋 Bot stopped by user (Ctrl+C)")
-            except Exception as e:
-                logger.error(f"❌ API server error: {e}")
-        else:
-            logger.info("🌐 FastAPI not available - running in console mode only")
-            logger.info("⏳ Trading Bot is now ACTIVE (console mode)...")
-            logger.info("📍 Use Ctrl+C to stop the bot")
-            
-            try:
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                logger.info("👋 Bot stopped by user (Ctrl+C)")
+            logger.error(f"❌ Error running trading bots: {e}")
+            return 1
+        return 0
             
     except Exception as e:
         logger.critical(f"💥 Critical error in main execution: {e}")
         logger.critical(traceback.format_exc())
-        exit(1)
\ No newline at end of file
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -1,13 +1,27 @@
 import pandas as pd
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import uvicorn, os, json, math
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+import uvicorn, os, json, math, csv, time, re, tempfile, threading
 from datetime import datetime
+from functools import lru_cache
+from html import escape
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 
+# Fast JSON for state.json (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ orjson not available, using json: {e}")
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 # ✅ FIXED: Custom JSON encoder for NaN values
 class SafeJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -17,10 +31,14 @@ class SafeJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 app = FastAPI()
+# Page, fragments, history rows and static files are mostly repetitive markup: compress them
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 app.mount("/static", StaticFiles(directory="static"), name="static")  # UNCOMMENTED
 
 CSV_FILE = "trades.csv"
 STATE_FILE = "state.json"
+# trades.csv header, as the bot writes it
+TRADE_COLUMNS = ["Trade #","Symbol","Side","Type","Date/Time","Signal","Price","Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"]
 
 def safe_read_csv():
     if not os.path.exists(CSV_FILE):
@@ -30,18 +48,6 @@ def safe_read_csv():
     except:
         return pd.DataFrame()
 
-def to_float_clean(s):
-    """Safe float conversion with error handling"""
-    try:
-        if s is None: return None
-        if isinstance(s, (int, float)):
-            return float(s)
-        x = str(s).replace("USDT","").replace("+","").replace(",","").strip()
-        if x=="" or x.lower() in ("nan","none", "null"): return None
-        return float(x)
-    except:
-        return None
-
 def safe_float_convert(value, default=0.0):
     """Safely convert any value to float"""
     try:
@@ -53,18 +59,36 @@ def safe_float_convert(value, default=0.0):
     except (ValueError, TypeError):
         return default
 
-def load_trades():
+def csv_signature():
+    """(inode, mtime_ns, size) of trades.csv; changes whenever the bot or this dashboard writes it"""
+    try:
+        st = os.stat(CSV_FILE)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=4)
+def _load_trades_cached(sig):
+    """Parsed trades.csv, cached per csv_signature(); callers share the frame and must not mutate it"""
     df = safe_read_csv()
-    expected = ["Trade #","Symbol","Side","Type","Date/Time","Signal","Price","Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"]
-    for c in expected:
+    for c in TRADE_COLUMNS:
         if c not in df.columns:
             df[c] = ""
     df = df.fillna("")
+    # Few distinct values each: string filters then run once per category, not once per row
+    for c in ("Signal", "Side", "Type"):
+        df[c] = df[c].astype("category")
     try:
         df["__dt_parsed"] = pd.to_datetime(df["Date/Time"], format='%b %d, %Y, %H:%M', errors="coerce")
     except:
         df["__dt_parsed"] = pd.to_datetime(df["Date/Time"], errors="coerce")
-    df["NetPnl_num"] = df["Net P&L"].apply(lambda v: to_float_clean(v) if v else 0.0)
+    # Strip "USDT", "+" and thousands commas column-wise: blank -> 0.0, unparseable -> NaN
+    pnl = df["Net P&L"].astype(str)
+    cleaned = (pnl.str.replace("USDT", "", regex=False)
+                  .str.replace("+", "", regex=False)
+                  .str.replace(",", "", regex=False)
+                  .str.strip())
+    df["NetPnl_num"] = pd.to_numeric(cleaned, errors="coerce").mask(pnl == "", 0.0)
     
     if not df.empty and "Trade #" in df.columns:
         df["Trade_Num"] = pd.to_numeric(df["Trade #"], errors="coerce")
@@ -75,50 +99,137 @@ def load_state():
     if not os.path.exists(STATE_FILE):
         return {}
     try:
-        with open(STATE_FILE,"r") as f:
-            return json.load(f)
+        with open(STATE_FILE,"rb") as f:
+            data = f.read()
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass  # older saves from here could hold NaN tokens, which only stdlib json accepts
+        return json.loads(data)
     except:
         return {}
 
+def state_signature():
+    """(inode, mtime_ns, size) of state.json; the bot replaces the file on every save"""
+    try:
+        st = os.stat(STATE_FILE)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=2)
+def _load_state_cached(sig):
+    return load_state()
+
+def read_state():
+    """Shared, read-only parse of state.json, reloaded only when the file changes; use load_state() to modify"""
+    return _load_state_cached(state_signature())
+
+# state.json is always rewritten whole, so every read-modify-write here (close, SL/TP edit)
+# must run one at a time or a concurrent save drops the other's change
+_state_write_lock = threading.Lock()
+
 def save_state(st):
     try:
-        with open(STATE_FILE,"w") as f:
+        if ORJSON_AVAILABLE:
+            # Same encoding as the bot: NaN/inf are written as null
+            data = orjson.dumps(st, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
             # ✅ FIXED: Use custom encoder to remove NaN values
-            json.dump(st, f, indent=2, cls=SafeJSONEncoder)
-        return True
+            data = json.dumps(st, indent=2, cls=SafeJSONEncoder).encode("utf-8")
+        return _write_state_bytes(data)
     except:
         return False
 
-def get_current_price(symbol):
-    """Get current price from Binance API with fallback"""
+def _write_state_bytes(data):
+    """Temp file + rename, as the bot does: readers never see a half-written state.json"""
+    dirn = os.path.dirname(STATE_FILE) or "."
+    delay = 0.05
+    for attempt in range(5):
+        fd, tmp = tempfile.mkstemp(prefix="state_", dir=dirn)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, STATE_FILE)
+            return True
+        except PermissionError:
+            # Windows refuses the rename while the bot has the file open; retry briefly
+            time.sleep(delay)
+            delay *= 2
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    print("Error saving state: state.json stayed locked")
+    return False
+
+BINANCE_PRICE_URL = "https://api.binance.com/api/v3/ticker/price"
+PRICE_CACHE_TTL = 1.0  # seconds a fetched price is reused across dashboard requests
+
+# ✅ FIXED: Mock prices used when Binance is unreachable
+MOCK_PRICES = {
+    "BTCUSDT": 50000.0, "ETHUSDT": 3000.0, "BNBUSDT": 500.0,
+    "SOLUSDT": 100.0, "XRPUSDT": 0.5, "ADAUSDT": 0.4,
+    "DOGEUSDT": 0.1, "PEPEUSDT": 0.00001, "LINKUSDT": 15.0,
+    "XLMUSDT": 0.12, "AVAXUSDT": 35.0, "DOTUSDT": 7.0,
+    "OPUSDT": 2.5, "TRXUSDT": 0.1
+}
+
+_price_cache = {}  # symbol -> (fetched_at, price)
+
+# One pooled keep-alive session, so price lookups reuse the TLS connection to Binance
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+def _fetch_price(symbol):
+    """Live price from Binance, or None when it can't be fetched"""
     try:
-        url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-        response = requests.get(url, timeout=5)
+        response = _http.get(BINANCE_PRICE_URL, params={"symbol": symbol}, timeout=5)
         if response.status_code == 200:
             data = response.json()
             return float(data['price'])
+        print(f"Binance API error: {response.status_code}")
+    except Exception as e:
+        print(f"Binance API connection failed: {e}")
+    return None
+
+def get_current_price(symbol):
+    """Get current price from Binance API with fallback"""
+    price = _fetch_price(symbol)
+    return MOCK_PRICES.get(symbol, 100.0) if price is None else price
+
+def get_current_prices(symbols):
+    """Prices for several symbols from one /ticker/price request, reused for PRICE_CACHE_TTL seconds"""
+    now = time.time()
+    prices = {}
+    for symbol in symbols:
+        cached = _price_cache.get(symbol)
+        if cached and now - cached[0] < PRICE_CACHE_TTL:
+            prices[symbol] = cached[1]
+    missing = [s for s in symbols if s not in prices]
+    if not missing:
+        return prices
+    try:
+        response = _http.get(BINANCE_PRICE_URL, params={"symbols": json.dumps(missing, separators=(",", ":"))}, timeout=5)
+        if response.status_code == 200:
+            for item in response.json():
+                price = float(item["price"])
+                _price_cache[item["symbol"]] = (now, price)
+                prices[item["symbol"]] = price
         else:
             print(f"Binance API error: {response.status_code}")
-            # ✅ FIXED: Return mock price instead of None
-            mock_prices = {
-                "BTCUSDT": 50000.0, "ETHUSDT": 3000.0, "BNBUSDT": 500.0,
-                "SOLUSDT": 100.0, "XRPUSDT": 0.5, "ADAUSDT": 0.4,
-                "DOGEUSDT": 0.1, "PEPEUSDT": 0.00001, "LINKUSDT": 15.0,
-                "XLMUSDT": 0.12, "AVAXUSDT": 35.0, "DOTUSDT": 7.0,
-                "OPUSDT": 2.5, "TRXUSDT": 0.1
-            }
-            return mock_prices.get(symbol, 100.0)
     except Exception as e:
         print(f"Binance API connection failed: {e}")
-        # ✅ FIXED: Return mock price instead of None
-        mock_prices = {
-            "BTCUSDT": 50000.0, "ETHUSDT": 3000.0, "BNBUSDT": 500.0,
-            "SOLUSDT": 100.0, "XRPUSDT": 0.5, "ADAUSDT": 0.4,
-            "DOGEUSDT": 0.1, "PEPEUSDT": 0.00001, "LINKUSDT": 15.0,
-            "XLMUSDT": 0.12, "AVAXUSDT": 35.0, "DOTUSDT": 7.0,
-            "OPUSDT": 2.5, "TRXUSDT": 0.1
-        }
-        return mock_prices.get(symbol, 100.0)
+    # One unknown symbol fails the whole batch; ask for the rest one by one (mock price on failure)
+    for symbol in missing:
+        if symbol not in prices:
+            price = _fetch_price(symbol)
+            if price is None:
+                price = MOCK_PRICES.get(symbol, 100.0)
+            else:
+                _price_cache[symbol] = (now, price)
+            prices[symbol] = price
+    return prices
 
 def calculate_daily_pnl(df):
     if df.empty or "NetPnl_num" not in df.columns:
@@ -134,36 +245,43 @@ def calculate_daily_pnl(df):
 def compute_cumulative(df):
     if df.empty:
         return df
-    d = df.copy().sort_values("Trade_Num", ascending=True)
-    cum = 0.0; computed=[]
-    for _, r in d.iterrows():
-        pnl = r.get("NetPnl_num")
-        if pd.notna(pnl):
-            cum += float(pnl)
-            computed.append(cum)
-        else:
-            computed.append(None)
-    d["Computed_Cum"] = computed
-    def display(row):
-        if pd.notna(row["Computed_Cum"]):
-            return f"{row['Computed_Cum']:.2f}"
-        return row.get("Cumulative P&L","") or ""
-    d["Cumulative P&L"] = d.apply(display, axis=1)
+    # sort_values already returns a new frame, so the columns set below never touch df
+    d = df.sort_values("Trade_Num", ascending=True)
+    pnl = d["NetPnl_num"]
+    # Running total over rows with a P&L; rows without one get no computed value
+    cum = pnl.fillna(0.0).cumsum().where(pnl.notna())
+    d["Computed_Cum"] = cum
+    shown = cum.map("{:.2f}".format, na_action="ignore")
+    d["Cumulative P&L"] = shown.where(cum.notna(), d["Cumulative P&L"].fillna(""))
     return d
 
-def calculate_risk_metrics(df):
+# Signals carry details ("Exit (SL)", "Partial Close (TP1)"), so this is a substring match, not a token set
+EXIT_SIGNAL_RE = re.compile("Exit|Close")
+
+def exit_rows(df):
+    """Rows whose Signal marks an exit or close"""
+    return df[df["Signal"].str.contains(EXIT_SIGNAL_RE, na=False)]
+
+def calculate_risk_metrics(df, exit_trades=None):
     """Calculate advanced risk metrics"""
     if df.empty:
         return {}
     
-    exit_trades = df[df["Signal"].str.contains("Exit|Close", na=False)]
-    total_trades = len(exit_trades)
-    winning_trades = len(exit_trades[exit_trades["NetPnl_num"] > 0])
-    losing_trades = len(exit_trades[exit_trades["NetPnl_num"] < 0])
-    breakeven_trades = len(exit_trades[exit_trades["NetPnl_num"] == 0])
+    if exit_trades is None:
+        exit_trades = exit_rows(df)
+    # Split the exit P&Ls once; every count, sum and extreme below reads these arrays
+    pnl = exit_trades["NetPnl_num"].to_numpy(dtype=float)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    known = pnl[~np.isnan(pnl)]
+    
+    total_trades = len(pnl)
+    winning_trades = len(wins)
+    losing_trades = len(losses)
+    breakeven_trades = int(np.count_nonzero(pnl == 0))
     
-    total_profit = exit_trades[exit_trades["NetPnl_num"] > 0]["NetPnl_num"].sum()
-    total_loss = abs(exit_trades[exit_trades["NetPnl_num"] < 0]["NetPnl_num"].sum())
+    total_profit = wins.sum()
+    total_loss = abs(losses.sum())
     
     # ✅ FIXED: Handle NaN and infinite values
     win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0.0
@@ -171,14 +289,10 @@ def calculate_risk_metrics(df):
     profit_factor = (total_profit / total_loss) if total_loss > 0 else float('inf')
     
     # ✅ FIXED: Clean NaN values
-    largest_win = exit_trades["NetPnl_num"].max() if not exit_trades.empty and not exit_trades["NetPnl_num"].isna().all() else 0.0
-    largest_loss = exit_trades["NetPnl_num"].min() if not exit_trades.empty and not exit_trades["NetPnl_num"].isna().all() else 0.0
-    
-    avg_win_trades = exit_trades[exit_trades["NetPnl_num"] > 0]
-    avg_win = avg_win_trades["NetPnl_num"].mean() if not avg_win_trades.empty and not avg_win_trades["NetPnl_num"].isna().all() else 0.0
-    
-    avg_loss_trades = exit_trades[exit_trades["NetPnl_num"] < 0]
-    avg_loss = avg_loss_trades["NetPnl_num"].mean() if not avg_loss_trades.empty and not avg_loss_trades["NetPnl_num"].isna().all() else 0.0
+    largest_win = float(known.max()) if known.size else 0.0
+    largest_loss = float(known.min()) if known.size else 0.0
+    avg_win = wins.mean() if wins.size else 0.0
+    avg_loss = losses.mean() if losses.size else 0.0
     
     return {
         "total_trades": total_trades,
@@ -196,8 +310,11 @@ def calculate_risk_metrics(df):
 
 def get_open_trades_with_pnl():
     """Get open trades with live PnL calculation"""
-    state = load_state()
+    state = read_state()
     open_trades = state.get("open_trades", {})
+    if not open_trades:
+        return []
+    prices = get_current_prices(list(open_trades))
     
     result = []
     for symbol, trade_info in open_trades.items():
@@ -206,7 +323,7 @@ def get_open_trades_with_pnl():
             quantity = safe_float_convert(trade_info.get("total_quantity") or trade_info.get("quantity"), 0)
             side = trade_info.get("side", "long")
             
-            current_price = get_current_price(symbol)
+            current_price = prices.get(symbol)
             if current_price is None:
                 current_price = entry_price
             
@@ -263,136 +380,121 @@ def get_open_trades_with_pnl():
 def append_trade_row(row: dict):
     """Append a trade row to CSV"""
     try:
-        df = safe_read_csv()
-        cols = ["Trade #","Symbol","Side","Type","Date/Time","Signal","Price","Position size","Net P&L","Run-up","Drawdown","Cumulative P&L"]
+        new_row = {c: row.get(c, "") for c in TRADE_COLUMNS}
         
-        for c in cols:
+        # Same approach as the bot: append one line when the header is the standard one
+        with open(CSV_FILE, "a+", newline="", encoding="utf-8") as f:
+            f.seek(0)
+            header = next(csv.reader(f), None)
+            if header is None or header == TRADE_COLUMNS:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                if header is None:
+                    writer.writerow(TRADE_COLUMNS)
+                writer.writerow(new_row.values())
+                return True
+        
+        # Non-standard header: rewrite once with the expected columns
+        df = safe_read_csv()
+        for c in TRADE_COLUMNS:
             if c not in df.columns:
                 df[c] = ""
-        
-        new_row = {c: row.get(c, "") for c in cols}
         df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        df.to_csv(CSV_FILE, index=False, columns=cols)
+        df.to_csv(CSV_FILE, index=False, columns=TRADE_COLUMNS)
         return True
     except Exception as e:
         print(f"Error appending trade row: {e}")
         return False
 
-def format_trade_history(df):
-    """Format trade history with merged rows for same trade"""
-    if df.empty:
-        return "<div class='section trade-history-section'><h3>📋 Trade History</h3><p>No trade history available</p></div>"
-    
+def clean_value(val):
+    if not val or pd.isna(val):
+        return ""
+    return str(val).replace('USD', '').replace('↑', '').replace('+', '').replace(',', '').strip()
+
+def format_currency(val, is_exit=False):
+    try:
+        clean_val = clean_value(val)
+        if clean_val and clean_val != 'nan':
+            return f"{float(clean_val):.2f} USD↑"
+    except:
+        pass
+    return str(val) if val else ""
+
+def format_percentage(val):
+    try:
+        clean_val = clean_value(val)
+        if clean_val and clean_val != 'nan':
+            return f"{float(clean_val):.2f}%"
+    except:
+        pass
+    return str(val) if val else ""
+
+def format_position_size(val, is_exit=False):
+    try:
+        clean_val = clean_value(val)
+        if clean_val and clean_val != 'nan':
+            if is_exit:
+                return f"{float(clean_val):.2f}"
+            else:
+                return f"{float(clean_val):.2f} USD↑"
+    except:
+        pass
+    return str(val) if val else ""
+
+def format_pnl(val, is_exit=False):
+    try:
+        clean_val = clean_value(val)
+        if clean_val and clean_val != 'nan':
+            val_float = float(clean_val)
+            if is_exit:
+                sign = "+" if val_float >= 0 else ""
+                return f"{sign}{val_float:.2f} USD↑"
+            else:
+                sign = "+" if val_float >= 0 else ""
+                return f"{sign}{abs(val_float):.2f}%"
+    except:
+        pass
+    return str(val) if val else ""
+
+HISTORY_PAGE_TRADES = 200
+
+def trade_history_groups(df):
+    """Row HTML for each trade, newest first, and the symbols in the order they appear"""
     df_disp = df.sort_values(["Trade_Num", "Date/Time"], ascending=[False, True])
     
-    html = """
-    <div class="section trade-history-section">
-        <h3>📋 Trade History</h3>
-        <div class="trade-history-container">
-            <table class="trade-table" id="tradesTable">
-                <thead>
-                    <tr>
-                        <th class="col-trade-no">Trade #</th>
-                        <th class="col-symbol">Symbol</th>
-                        <th class="col-type">Type</th>
-                        <th class="col-date">Date / Time</th>
-                        <th class="col-signal">Signal</th>
-                        <th class="col-price">Price</th>
-                        <th class="col-size">Position size</th>
-                        <th class="col-pnl">Net P&L</th>
-                        <th class="col-runup">Run-up</th>
-                        <th class="col-drawdown">Drawdown</th>
-                        <th class="col-cumulative">Cumulative P&L</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
+    # Every cell is formatted column by column up front; the loop below only assembles rows
+    exit_flags = df_disp["Signal"].str.contains(EXIT_SIGNAL_RE).to_numpy()
+    
+    def by_kind(col, exit_fmt, entry_fmt):
+        values = df_disp[col]
+        return np.where(exit_flags, values.map(exit_fmt).to_numpy(), values.map(entry_fmt).to_numpy())
     
+    columns = zip(
+        df_disp["Trade #"], df_disp["Type"], df_disp["Date/Time"], df_disp["Signal"], exit_flags,
+        df_disp["Price"].map(format_currency),
+        by_kind("Position size", lambda v: format_position_size(v, True), format_position_size),
+        by_kind("Net P&L", lambda v: format_pnl(v, True), format_pnl),
+        by_kind("Run-up", format_currency, format_percentage),
+        by_kind("Drawdown", format_currency, format_percentage),
+        by_kind("Cumulative P&L", format_currency, format_percentage),
+        np.where(df_disp["NetPnl_num"].to_numpy() >= 0, "positive", "negative"),
+    )
+    
+    groups = []
+    symbols = {}  # insertion-ordered set
     current_trade_num = None
     trade_rows = []
     
-    for _, row in df_disp.iterrows():
-        trade_num = row.get('Trade #', '')
-        trade_type = row.get('Type', '')
-        date_time = row.get('Date/Time', '')
-        signal = row.get('Signal', '')
-        price = row.get('Price', '')
-        position_size = row.get('Position size', '')
-        net_pnl = row.get('Net P&L', '')
-        run_up = row.get('Run-up', '')
-        drawdown = row.get('Drawdown', '')
-        cumulative = row.get('Cumulative P&L', '')
-        
+    for (trade_num, trade_type, date_time, signal, is_exit, formatted_price, formatted_position_size,
+         formatted_pnl, formatted_runup, formatted_drawdown, formatted_cumulative, pnl_cls) in columns:
         symbol_parts = str(trade_type).split(' ')
         symbol = symbol_parts[0] if symbol_parts else ''
         direction = symbol_parts[1] if len(symbol_parts) > 1 else ''
-        
-        is_exit = "Exit" in str(signal) or "Close" in str(signal)
         display_type = "Exit" if is_exit else "Entry"
-        
-        pnl_num = row.get("NetPnl_num", 0)
-        pnl_cls = "positive" if pnl_num >= 0 else "negative"
-        
-        def clean_value(val):
-            if not val or pd.isna(val):
-                return ""
-            return str(val).replace('USD', '').replace('↑', '').replace('+', '').replace(',', '').strip()
-        
-        def format_currency(val, is_exit=False):
-            try:
-                clean_val = clean_value(val)
-                if clean_val and clean_val != 'nan':
-                    return f"{float(clean_val):.2f} USD↑"
-            except:
-                pass
-            return str(val) if val else ""
-        
-        def format_percentage(val):
-            try:
-                clean_val = clean_value(val)
-                if clean_val and clean_val != 'nan':
-                    return f"{float(clean_val):.2f}%"
-            except:
-                pass
-            return str(val) if val else ""
-        
-        def format_position_size(val, is_exit=False):
-            try:
-                clean_val = clean_value(val)
-                if clean_val and clean_val != 'nan':
-                    if is_exit:
-                        return f"{float(clean_val):.2f}"
-                    else:
-                        return f"{float(clean_val):.2f} USD↑"
-            except:
-                pass
-            return str(val) if val else ""
-        
-        def format_pnl(val, is_exit=False):
-            try:
-                clean_val = clean_value(val)
-                if clean_val and clean_val != 'nan':
-                    val_float = float(clean_val)
-                    if is_exit:
-                        sign = "+" if val_float >= 0 else ""
-                        return f"{sign}{val_float:.2f} USD↑"
-                    else:
-                        sign = "+" if val_float >= 0 else ""
-                        return f"{sign}{abs(val_float):.2f}%"
-            except:
-                pass
-            return str(val) if val else ""
-        
-        formatted_price = format_currency(price, is_exit)
-        formatted_position_size = format_position_size(position_size, is_exit)
-        formatted_pnl = format_pnl(net_pnl, is_exit)
-        formatted_runup = format_percentage(run_up) if not is_exit else format_currency(run_up, is_exit)
-        formatted_drawdown = format_percentage(drawdown) if not is_exit else format_currency(drawdown, is_exit)
-        formatted_cumulative = format_percentage(cumulative) if not is_exit else format_currency(cumulative, is_exit)
+        symbols[symbol] = None
         
         if trade_num != current_trade_num:
             if trade_rows:
-                html += process_trade_group(trade_rows)
+                groups.append(process_trade_group(trade_rows))
             trade_rows = []
             current_trade_num = trade_num
         
@@ -409,20 +511,56 @@ def format_trade_history(df):
             'formatted_runup': formatted_runup,
             'formatted_drawdown': formatted_drawdown,
             'formatted_cumulative': formatted_cumulative,
-            'pnl_cls': pnl_cls,
-            'is_exit': is_exit
+            'pnl_cls': str(pnl_cls),
+            'is_exit': bool(is_exit)
         })
     
     if trade_rows:
-        html += process_trade_group(trade_rows)
+        groups.append(process_trade_group(trade_rows))
+    return groups, list(symbols)
+
+def format_trade_history(df, history=None):
+    """Format trade history with merged rows for same trade; only the newest
+    HISTORY_PAGE_TRADES trades are inlined, the page fetches older ones on scroll"""
+    if df.empty:
+        return "<div class='section trade-history-section' id='historyPanel'><h3>📋 Trade History</h3><p>No trade history available</p></div>"
     
-    html += """
+    groups, _ = trade_history_groups(df) if history is None else history
+    page = groups[:HISTORY_PAGE_TRADES]
+    
+    # Collected as parts and joined once; += on a growing string copies it on every row
+    parts = [f"""
+    <div class="section trade-history-section" id="historyPanel"
+         data-loaded="{len(page)}" data-total="{len(groups)}">
+        <h3>📋 Trade History</h3>
+        <div class="trade-history-container">
+            <table class="trade-table" id="tradesTable">
+                <thead>
+                    <tr>
+                        <th class="col-trade-no">Trade #</th>
+                        <th class="col-symbol">Symbol</th>
+                        <th class="col-type">Type</th>
+                        <th class="col-date">Date / Time</th>
+                        <th class="col-signal">Signal</th>
+                        <th class="col-price">Price</th>
+                        <th class="col-size">Position size</th>
+                        <th class="col-pnl">Net P&L</th>
+                        <th class="col-runup">Run-up</th>
+                        <th class="col-drawdown">Drawdown</th>
+                        <th class="col-cumulative">Cumulative P&L</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """]
+    parts.extend(page)
+    parts.append("""
                 </tbody>
             </table>
+            <div id="historySentinel"></div>
         </div>
     </div>
-    """
-    return html
+    """)
+    return "".join(parts)
 
 def process_trade_group(trade_rows):
     """Process a group of trades with same trade number"""
@@ -431,13 +569,23 @@ def process_trade_group(trade_rows):
     
     trade_rows.sort(key=lambda x: 0 if x['display_type'] == 'Entry' else 1)
     
-    html = ""
+    parts = []
     first_row = True
+    group = trade_rows[0]
     
     for trade in trade_rows:
+        # Filter keys for the page's search and selects; every row of a group carries the
+        # trade number and symbol so a match never splits a rowspan group
+        search = " ".join(str(v) for v in (
+            group['trade_num'], trade['symbol'], trade['direction'], trade['display_type'],
+            trade['date_time'], trade['signal'], trade['formatted_price'], trade['formatted_position_size'],
+            trade['formatted_pnl'], trade['formatted_runup'], trade['formatted_drawdown'],
+            trade['formatted_cumulative'])).lower()
+        data_attrs = (f'data-symbol="{escape(str(trade["symbol"]))}" data-side="{escape(str(trade["direction"]))}" '
+                      f'data-search="{escape(search)}"')
         if first_row:
-            html += f"""
-                    <tr class="trade-row {'exit-row' if trade['is_exit'] else 'entry-row'} {trade['direction'].lower()}">
+            parts.append(f"""
+                    <tr class="trade-row {'exit-row' if trade['is_exit'] else 'entry-row'} {trade['direction'].lower()}" {data_attrs}>
                         <td class="col-trade-no" rowspan="{len(trade_rows)}">{trade['trade_num']}</td>
                         <td class="col-symbol" rowspan="{len(trade_rows)}">{trade['symbol']} {trade['direction']}</td>
                         <td class="col-type">{trade['display_type']}</td>
@@ -450,11 +598,11 @@ def process_trade_group(trade_rows):
                         <td class="col-drawdown">{trade['formatted_drawdown']}</td>
                         <td class="col-cumulative">{trade['formatted_cumulative']}</td>
                     </tr>
-            """
+            """)
             first_row = False
         else:
-            html += f"""
-                    <tr class="trade-row {'exit-row' if trade['is_exit'] else 'entry-row'} {trade['direction'].lower()}">
+            parts.append(f"""
+                    <tr class="trade-row {'exit-row' if trade['is_exit'] else 'entry-row'} {trade['direction'].lower()}" {data_attrs}>
                         <td class="col-type">{trade['display_type']}</td>
                         <td class="col-date">{trade['date_time']}</td>
                         <td class="col-signal">{trade['signal']}</td>
@@ -465,24 +613,145 @@ def process_trade_group(trade_rows):
                         <td class="col-drawdown">{trade['formatted_drawdown']}</td>
                         <td class="col-cumulative">{trade['formatted_cumulative']}</td>
                     </tr>
-            """
+            """)
     
-    return html
+    return "".join(parts)
 
-@app.get("/", response_class=HTMLResponse)
-def dashboard():
-    df = load_trades()
+@lru_cache(maxsize=4)
+def _history_views(sig):
+    """Everything the dashboard derives from trades.csv alone, computed once per file version"""
+    df = _load_trades_cached(sig)
     df = compute_cumulative(df) if not df.empty else df
-    daily = calculate_daily_pnl(df)
-    risk_metrics = calculate_risk_metrics(df)
+    exit_trades = exit_rows(df)
+    all_time = all_time_pnl(df)
+    risk_metrics = calculate_risk_metrics(df, exit_trades)
+    history = trade_history_groups(df) if not df.empty else ([], [])
+    return (df, exit_trades, all_time, calculate_daily_pnl(df), risk_metrics,
+            *summary_fragments(exit_trades, all_time, risk_metrics),
+            format_trade_history(df, history), symbol_options(history[1]), history)
+
+def symbol_options(symbols):
+    """<option> list for the symbol filter, covering trades not loaded into the table yet"""
+    return '<option value="">All Symbols</option>' + "".join(
+        f'<option value="{escape(s)}">{escape(s)}</option>' for s in sorted(symbols))
 
-    all_time = 0.0
+def summary_fragments(exit_trades, all_time, risk_metrics):
+    """Stats cards and the analytics tables; they only depend on trades.csv, so
+    _history_views builds them once per file version"""
+    # Summary table
+    summary_html = "<div class='summary-table'><h4>Trade Summary</h4><table>"
+    summary_html += "<tr><th>Type</th><th>Total</th><th>Success</th><th>SL Hit</th><th>Win%</th><th>Loss%</th></tr>"
+    
+    # One groupby pass gives the per-side counts instead of a mask filter per column
+    pnl = exit_trades["NetPnl_num"]
+    counts = pd.DataFrame({"total": 1, "success": pnl > 0, "sl_hit": pnl < 0}).groupby(
+        exit_trades["Side"].str.upper()).sum()
+    
+    def summary_row(typ):
+        total, success, sl_hit = counts.loc[typ, ["total", "success", "sl_hit"]]
+        win_pct = f"{(success/total*100):.1f}%" if total>0 else "0%"
+        loss_pct = f"{(sl_hit/total*100):.1f}%" if total>0 else "0%"
+        return f"<tr><td>{typ}</td><td>{total}</td><td class='positive'>{success}</td><td class='negative'>{sl_hit}</td><td>{win_pct}</td><td>{loss_pct}</td></tr>"
+    
+    for typ in ("LONG", "SHORT"):
+        if typ in counts.index:
+            summary_html += summary_row(typ)
+    summary_html += "</table></div>"
+
+    # Risk Metrics
+    risk_metrics_html = ""
+    if risk_metrics:
+        # ✅ FIXED: Clean NaN values in risk metrics
+        win_rate = risk_metrics.get('win_rate', 0)
+        profit_factor = risk_metrics.get('profit_factor', 0)
+        avg_win = risk_metrics.get('avg_win', 0)
+        avg_loss = risk_metrics.get('avg_loss', 0)
+        
+        # Handle infinite profit factor
+        if profit_factor == float('inf'):
+            profit_factor_display = "∞"
+        else:
+            profit_factor_display = f"{profit_factor:.2f}"
+        
+        risk_metrics_html = f"""
+        <div class="risk-metrics">
+            <h4>📊 Risk Metrics</h4>
+            <div class="metrics-grid">
+                <div class="metric-card">
+                    <span class="metric-label">Win Rate</span>
+                    <span class="metric-value">{win_rate:.1f}%</span>
+                </div>
+                <div class="metric-card">
+                    <span class="metric-label">Profit Factor</span>
+                    <span class="metric-value">{profit_factor_display}</span>
+                </div>
+                <div class="metric-card">
+                    <span class="metric-label">Avg Win</span>
+                    <span class="metric-value positive">{avg_win:.2f}</span>
+                </div>
+                <div class="metric-card">
+                    <span class="metric-label">Avg Loss</span>
+                    <span class="metric-value negative">{avg_loss:.2f}</span>
+                </div>
+            </div>
+        </div>
+        """
+
+    completed_trades_count = len(exit_trades)
+
+    stats_html = f"""
+                            <div class="stat-card">
+                                <h3>All Time P&L</h3>
+                                <div class="value {'positive' if all_time >= 0 else 'negative'}">{all_time:.2f} USDT</div>
+                            </div>
+                            <div class="stat-card">
+                                <h3>Total Trades</h3>
+                                <div class="value">{completed_trades_count}</div>
+                            </div>
+                            <div class="stat-card">
+                                <h3>Win Rate</h3>
+                                <div class="value">{risk_metrics.get('win_rate', 0):.1f}%</div>
+                            </div>
+                            <div class="stat-card">
+                                <h3>Profit Factor</h3>
+                                <div class="value">{risk_metrics.get('profit_factor', 0):.2f}</div>
+                            </div>
+                        """
+
+    return stats_html, summary_html + risk_metrics_html
+
+def csv_version(sig):
+    """csv_signature() as the string the page sends back to tell which trades.csv it shows"""
+    return "-".join(map(str, sig)) if sig else ""
+
+def all_time_pnl(df):
+    """Last running total from compute_cumulative, else the plain sum of Net P&L"""
     if not df.empty and "Computed_Cum" in df.columns and df["Computed_Cum"].dropna().any():
         vals = df["Computed_Cum"].dropna()
-        all_time = float(vals.iloc[-1]) if not vals.empty else 0.0
-    elif not df.empty and df["NetPnl_num"].notnull().any():
-        all_time = float(df["NetPnl_num"].dropna().sum())
+        return float(vals.iloc[-1]) if not vals.empty else 0.0
+    if not df.empty and df["NetPnl_num"].notnull().any():
+        return float(df["NetPnl_num"].dropna().sum())
+    return 0.0
+
+# Static <head> of the dashboard page. Styles and scripts never change between requests, so
+# they are served from static/ and the browser caches them across refreshes
+PAGE_HEAD = """
+    <html>
+    <head>
+        <title>Rafique Trading Dashboard</title>
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <link rel="stylesheet" href="/static/dashboard.css">
+        <script src="/static/dashboard.js"></script>
+    </head>"""
+
+def dashboard_fragments():
+    """Dynamic parts of the dashboard page, shared by the full page and the polling endpoint"""
+    sig = csv_signature()
+    # Cached objects are shared between requests: read them, never mutate them
+    (df, exit_trades, all_time, daily, risk_metrics, stats_html, analytics_html,
+     trade_history_html, symbol_options_html, _) = _history_views(sig)
 
+    # Open positions carry live prices, so they are the one part rebuilt on every request
     open_trades = get_open_trades_with_pnl()
     
     open_html = "<p>No open positions</p>"
@@ -513,6 +782,7 @@ def dashboard():
                 sl_display_value = sl
                 sl_placeholder = "Stop Loss"
             
+            # The inputs are posted back whole by Update SL/TP; .10g keeps PEPE-sized levels off 0.0000
             opens.append(f"""
             <div class="position-card">
                 <div class="position-header">
@@ -547,19 +817,19 @@ def dashboard():
                     <div class="sltp-controls-horizontal">
                         <div class="control-group">
                             <label>SL:</label>
-                            <input type="text" id="sl_{symbol}" value="{sl_display_value:.4f}" placeholder="{sl_placeholder}">
+                            <input type="text" id="sl_{symbol}" value="{sl_display_value:.10g}" placeholder="{sl_placeholder}">
                         </div>
                         <div class="control-group">
                             <label>TP1:</label>
-                            <input type="text" id="tp1_{symbol}" value="{tp1:.4f}" placeholder="Take Profit 1">
+                            <input type="text" id="tp1_{symbol}" value="{tp1:.10g}" placeholder="Take Profit 1">
                         </div>
                         <div class="control-group">
                             <label>TP2:</label>
-                            <input type="text" id="tp2_{symbol}" value="{tp2:.4f}" placeholder="Take Profit 2">
+                            <input type="text" id="tp2_{symbol}" value="{tp2:.10g}" placeholder="Take Profit 2">
                         </div>
                         <div class="control-group">
                             <label>TP3:</label>
-                            <input type="text" id="tp3_{symbol}" value="{tp3:.4f}" placeholder="Take Profit 3">
+                            <input type="text" id="tp3_{symbol}" value="{tp3:.10g}" placeholder="Take Profit 3">
                         </div>
                         <button class="btn-secondary" onclick="updateSLTP('{symbol}')">Update SL/TP</button>
                         <button class="btn-danger" onclick="closeTrade('{symbol}')">Close Trade</button>
@@ -574,650 +844,24 @@ def dashboard():
         </div>
         """
 
-    # Summary table
-    summary_html = "<div class='summary-table'><h4>Trade Summary</h4><table>"
-    summary_html += "<tr><th>Type</th><th>Total</th><th>Success</th><th>SL Hit</th><th>Win%</th><th>Loss%</th></tr>"
-    
-    exit_trades = df[df["Signal"].str.contains("Exit|Close", na=False)]
-    long_trades = exit_trades[exit_trades["Side"].str.upper()=="LONG"]
-    short_trades = exit_trades[exit_trades["Side"].str.upper()=="SHORT"]
-    
-    def summary_row(df_side, typ):
-        total = len(df_side)
-        success = len(df_side[df_side["NetPnl_num"]>0])
-        sl_hit = len(df_side[df_side["NetPnl_num"]<0])
-        win_pct = f"{(success/total*100):.1f}%" if total>0 else "0%"
-        loss_pct = f"{(sl_hit/total*100):.1f}%" if total>0 else "0%"
-        return f"<tr><td>{typ}</td><td>{total}</td><td class='positive'>{success}</td><td class='negative'>{sl_hit}</td><td>{win_pct}</td><td>{loss_pct}</td></tr>"
-    
-    if not long_trades.empty:
-        summary_html += summary_row(long_trades,"LONG")
-    if not short_trades.empty:
-        summary_html += summary_row(short_trades,"SHORT")
-    summary_html += "</table></div>"
-
-    # Risk Metrics
-    risk_metrics_html = ""
-    if risk_metrics:
-        # ✅ FIXED: Clean NaN values in risk metrics
-        win_rate = risk_metrics.get('win_rate', 0)
-        profit_factor = risk_metrics.get('profit_factor', 0)
-        avg_win = risk_metrics.get('avg_win', 0)
-        avg_loss = risk_metrics.get('avg_loss', 0)
-        
-        # Handle infinite profit factor
-        if profit_factor == float('inf'):
-            profit_factor_display = "∞"
-        else:
-            profit_factor_display = f"{profit_factor:.2f}"
-        
-        risk_metrics_html = f"""
-        <div class="risk-metrics">
-            <h4>📊 Risk Metrics</h4>
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <span class="metric-label">Win Rate</span>
-                    <span class="metric-value">{win_rate:.1f}%</span>
-                </div>
-                <div class="metric-card">
-                    <span class="metric-label">Profit Factor</span>
-                    <span class="metric-value">{profit_factor_display}</span>
-                </div>
-                <div class="metric-card">
-                    <span class="metric-label">Avg Win</span>
-                    <span class="metric-value positive">{avg_win:.2f}</span>
-                </div>
-                <div class="metric-card">
-                    <span class="metric-label">Avg Loss</span>
-                    <span class="metric-value negative">{avg_loss:.2f}</span>
-                </div>
-            </div>
-        </div>
-        """
+    return {
+        "version": csv_version(sig),
+        "stats_html": stats_html,
+        "analytics_html": analytics_html,
+        "open_html": f"""
+                            <h3>📈 Open Positions ({len(open_trades)})</h3>
+                            {open_html}
+                        """,
+        "trade_history_html": trade_history_html,
+        "symbol_options_html": symbol_options_html,
+    }
 
-    trade_history_html = format_trade_history(df)
-    completed_trades_count = len(df[df["Signal"].str.contains("Exit|Close", na=False)])
+@app.get("/", response_class=HTMLResponse)
+def dashboard():
+    f = dashboard_fragments()
 
-    html = f"""
-    <html>
-    <head>
-        <title>Rafique Trading Dashboard</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            :root {{
-                --primary: #2563eb;
-                --success: #10b981;
-                --danger: #ef4444;
-                --warning: #f59e0b;
-                --dark: #1f2937;
-                --light: #f3f4f6;
-            }}
-            
-            * {{
-                box-sizing: border-box;
-                margin: 0;
-                padding: 0;
-            }}
-            
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                margin: 0;
-                padding: 0;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                height: 100vh;
-                overflow: hidden;
-                color: #333;
-            }}
-            
-            .container {{
-                max-width: 1800px;
-                margin: 0 auto;
-                background: white;
-                height: 100vh;
-                display: flex;
-                flex-direction: column;
-                box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            }}
-            
-            .header {{
-                background: var(--dark);
-                color: white;
-                padding: 10px 15px;
-                text-align: center;
-                flex-shrink: 0;
-            }}
-            
-            .header h1 {{
-                margin: 0;
-                font-size: 1.5em;
-                font-weight: 300;
-            }}
-            
-            .main-content {{
-                padding: 10px;
-                display: flex;
-                flex-direction: column;
-                height: calc(100vh - 60px);
-                overflow: hidden;
-                gap: 10px;
-            }}
-            
-            /* TOP SECTION - Fixed height, no scroll */
-            .dashboard-top {{
-                    display: grid;
-    grid-template-columns: 1fr 1fr;
-    gap: 10px;
-    height: auto;     /* ✅ AUTO HEIGHT */
-    min-height: 300px;
-    flex-shrink: 0;
-    overflow: hidden; /* ✅ NO SCROLL */
-            }}
-            
-            .left-panel {{
-                display: flex;
-                flex-direction: column;
-                gap: 10px;
-            }}
-            
-            .right-panel {{
-                display: flex;
-                flex-direction: column;
-                gap: 10px;
-            }}
-            
-            .stats-overview {{
-                display: grid;
-                grid-template-columns: repeat(2, 1fr);
-                gap: 8px;
-            }}
-            
-            .stat-card {{
-                background: white;
-                padding: 8px;
-                border-radius: 6px;
-                box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                text-align: center;
-                border-left: 3px solid var(--primary);
-            }}
-            
-            .stat-card h3 {{
-                color: var(--dark);
-                margin-bottom: 3px;
-                font-size: 0.7em;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }}
-            
-            .stat-card .value {{
-                font-size: 1.1em;
-                font-weight: bold;
-            }}
-            
-            .positive {{ color: var(--success); }}
-            .negative {{ color: var(--danger); }}
-            
-            .section {{
-                background: white;
-                padding: 8px;
-                border-radius: 6px;
-                box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                flex: 1;
-                display: flex;
-                flex-direction: column;
-                min-height: 0;
-		overflow: hidden;
-            }}
-            
-            .section h3 {{
-                color: var(--dark);
-                margin-bottom: 6px;
-                padding-bottom: 4px;
-                border-bottom: 1px solid var(--light);
-                font-size: 0.9em;
-                flex-shrink: 0;
-            }}
-            
-            /* Open Positions */
-            .positions-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-                gap: 6px;
-                overflow: visible;
-                flex: 1;
-                padding: 3px;
-		max-height: none;
-            }}
-            
-            .position-card {{
-                border: 1px solid #e5e7eb;
-                border-radius: 5px;
-                padding: 6px;
-                background: #fafafa;
-                min-height: 150px;
-		font-size: 0.7em;
-            }}
-            
-            .position-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 6px;
-            }}
-            
-            .symbol {{
-                font-weight: bold;
-                font-size: 0.8em;
-            }}
-            
-            .side.long {{ color: var(--success); }}
-            .side.short {{ color: var(--danger); }}
-            
-            .position-details div {{
-                margin: 1px 0;
-                font-size: 0.65em;
-            }}
-            
-            .tp-levels {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 1px;
-                margin: 6px 0;
-		margin: 4px 0;
-		padding: 2px;
-                padding: 4px;
-                background: #f8fafc;
-                border-radius: 3px;
-                border: 1px solid #e2e8f0;
-            }}
-            
-            .tp-level {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-            }}
-            
-            .tp-label {{
-                font-size: 0.65em;
-                color: #64748b;
-                font-weight: 600;
-            }}
-            
-            .tp-value {{
-                font-size: 0.65em;
-                font-weight: bold;
-                color: #1e293b;
-            }}
-            
-            .sltp-controls-horizontal {{
-                display: flex;
-                gap: 4px;
-                align-items: center;
-                flex-wrap: wrap;
-                margin-top: 6px;
-            }}
-            
-            .control-group {{
-                display: flex;
-                flex-direction: column;
-                gap: 1px;
-            }}
-            
-            .control-group label {{
-                font-size: 0.55em;
-                color: #666;
-                font-weight: 600;
-            }}
-            
-            .sltp-controls-horizontal input {{
-                width: 55px;
-                padding: 2px;
-                border: 1px solid #ccc;
-                border-radius: 2px;
-                font-size: 0.65em;
-                text-align: center;
-            }}
-            
-            button {{
-                padding: 3px 6px;
-                border: none;
-                border-radius: 2px;
-                cursor: pointer;
-                font-size: 0.65em;
-                transition: all 0.3s ease;
-                white-space: nowrap;
-            }}
-            
-            .btn-secondary {{
-                background: var(--primary);
-                color: white;
-            }}
-            
-            .btn-danger {{
-                background: var(--danger);
-                color: white;
-            }}
-            
-            .btn-export {{
-                background: var(--warning);
-                color: white;
-            }}
-            
-            /* Summary and Risk Metrics */
-            .summary-table table {{
-                width: 100%;
-                border-collapse: collapse;
-                font-size: 0.7em;
-            }}
-            
-            .summary-table th, .summary-table td {{
-                border: 1px solid #e5e7eb;
-                padding: 4px;
-                text-align: center;
-            }}
-            
-            .summary-table th {{
-                background: var(--light);
-                font-weight: 600;
-            }}
-            
-            .metrics-grid {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 6px;
-            }}
-            
-            .metric-card {{
-                background: var(--light);
-                padding: 6px;
-                border-radius: 4px;
-                text-align: center;
-                border-left: 2px solid var(--primary);
-            }}
-            
-            .metric-label {{
-                display: block;
-                font-size: 0.6em;
-                color: #666;
-                margin-bottom: 2px;
-            }}
-            
-            .metric-value {{
-                display: block;
-                font-size: 0.8em;
-                font-weight: bold;
-            }}
-            
-            .controls {{
-                display: flex;
-                gap: 6px;
-                margin-bottom: 8px;
-                flex-wrap: wrap;
-                flex-shrink: 0;
-            }}
-            
-            .search-box {{
-                padding: 4px 8px;
-                border: 1px solid #ccc;
-                border-radius: 3px;
-                flex: 1;
-                min-width: 120px;
-                font-size: 0.75em;
-            }}
-            
-            .filter-select {{
-                padding: 4px 8px;
-                border: 1px solid #ccc;
-                border-radius: 3px;
-                background: white;
-                font-size: 0.75em;
-            }}
-            
-            .export-buttons {{
-                display: flex;
-                gap: 6px;
-            }}
-            
-            /* BOTTOM SECTION - Trade History with Scroll - BIGGER HEIGHT */
-            .trade-history-section {{
-                flex: 1;
-                display: flex;
-                flex-direction: column;
-                min-height: 300px;
-		max-height: 50vh;
-                
-            }}
-            
-            .trade-history-container {{
-                flex: 1;
-                overflow: auto;
-                border: 1px solid #e5e7eb;
-                border-radius: 5px;
-                
-            }}
-            
-            .trade-table {{
-                width: 100%;
-                border-collapse: collapse;
-                font-size: 0.75em; /* Slightly larger font for better readability */
-                table-layout: fixed;
-                margin: 0;
-            }}
-            
-            .trade-table th, .trade-table td {{
-                padding: 6px 8px; /* More padding for better spacing */
-                border: 1px solid #e5e7eb;
-                text-align: left;
-                overflow: hidden;
-                text-overflow: ellipsis;
-                white-space: nowrap;
-            }}
-            
-            .trade-table th {{
-                background: #f8fafc;
-                font-weight: 600;
-                color: #374151;
-                position: sticky;
-                top: 0;
-                z-index: 10;
-                font-size: 0.8em; /* Slightly larger header font */
-            }}
-            
-            .col-trade-no {{ width: 70px; text-align: center; }}
-            .col-symbol {{ width: 100px; }}
-            .col-type {{ width: 70px; text-align: center; }}
-            .col-date {{ width: 130px; }}
-            .col-signal {{ width: 90px; text-align: center; }}
-            .col-price {{ width: 100px; text-align: right; }}
-            .col-size {{ width: 100px; text-align: right; }}
-            .col-pnl {{ width: 90px; text-align: center; }}
-            .col-runup {{ width: 90px; text-align: center; }}
-            .col-drawdown {{ width: 90px; text-align: center; }}
-            .col-cumulative {{ width: 100px; text-align: right; }}
-            
-            .trade-row {{
-                transition: background-color 0.2s;
-            }}
-            
-            .trade-row:hover {{
-                background-color: #f9fafb;
-            }}
-            
-            .entry-row {{
-                background-color: #ffffff;
-            }}
-            
-            .entry-row.long {{
-                border-left: 3px solid #10b981;
-            }}
-            
-            .entry-row.short {{
-                border-left: 3px solid #ef4444;
-            }}
-            
-            .exit-row {{
-                background-color: #f8fafc;
-                color: #6b7280;
-            }}
-            
-            @media (max-width: 1200px) {{
-                .dashboard-top {{
-                    grid-template-columns: 1fr;
-                    height: auto;
-                }}
-                
-                .positions-grid {{
-                    grid-template-columns: 1fr;
-                }}
-                
-                .trade-history-section {{
-                    height: auto;
-                    min-height: 300px;
-                }}
-            }}
-        </style>
-        <meta http-equiv="refresh" content="15">
-        <script>
-        function updateSLTP(sym) {{
-            let sl = document.getElementById("sl_"+sym).value;
-            let tp1 = document.getElementById("tp1_"+sym).value;
-            let tp2 = document.getElementById("tp2_"+sym).value;
-            let tp3 = document.getElementById("tp3_"+sym).value;
-            
-            fetch(`/update_sltp/${{sym}}`, {{
-                method: 'POST',
-                headers: {{
-                    'Content-Type': 'application/json',
-                }},
-                body: JSON.stringify({{
-                    sl: sl,
-                    tp1: tp1,
-                    tp2: tp2,
-                    tp3: tp3
-                }})
-            }})
-            .then(r => r.json())
-            .then(d => {{
-                if(d.status === 'ok') {{
-                    alert('SL/TP updated successfully!');
-                    location.reload();
-                }} else {{
-                    alert('Error updating SL/TP: ' + d.message);
-                }}
-            }})
-            .catch(error => {{
-                alert('Error updating SL/TP: ' + error);
-            }});
-        }}
-        
-        function closeTrade(sym) {{
-            if(confirm('Are you sure you want to close this trade?')) {{
-                fetch('/close_trade/'+sym, {{ method: 'POST' }})
-                    .then(r => r.json())
-                    .then(d => {{
-                        if(d.status === 'ok') {{
-                            alert('Trade closed successfully!');
-                            location.reload();
-                        }} else {{
-                            alert('Error closing trade: ' + d.message);
-                        }}
-                    }})
-                    .catch(error => {{
-                        alert('Error closing trade: ' + error);
-                    }});
-            }}
-        }}
-        
-        function searchTrades() {{
-            const input = document.getElementById('searchInput');
-            const filter = input.value.toLowerCase();
-            const table = document.getElementById('tradesTable');
-            const tr = table.getElementsByTagName('tr');
-            
-            for (let i = 1; i < tr.length; i++) {{
-                const td = tr[i].getElementsByTagName('td');
-                let found = false;
-                for (let j = 0; j < td.length; j++) {{
-                    if (td[j]) {{
-                        if (td[j].textContent.toLowerCase().indexOf(filter) > -1) {{
-                            found = true;
-                            break;
-                        }}
-                    }}
-                }}
-                tr[i].style.display = found ? '' : 'none';
-            }}
-        }}
-        
-        function exportTrades(format) {{
-            fetch(`/export/trades?format=${{format}}`)
-                .then(response => response.json())
-                .then(data => {{
-                    if(data.content) {{
-                        const blob = new Blob([data.content], {{ type: 'text/plain' }});
-                        const url = window.URL.createObjectURL(blob);
-                        const a = document.createElement('a');
-                        a.style.display = 'none';
-                        a.href = url;
-                        a.download = data.filename || `trades.${{format}}`;
-                        document.body.appendChild(a);
-                        a.click();
-                        window.URL.revokeObjectURL(url);
-                    }}
-                }});
-        }}
-        
-        function populateSymbolFilter() {{
-            const filter = document.getElementById('symbolFilter');
-            const symbols = new Set();
-            const table = document.getElementById('tradesTable');
-            const tr = table.getElementsByTagName('tr');
-            
-            for (let i = 1; i < tr.length; i++) {{
-                const td = tr[i].getElementsByTagName('td');
-                if(td[1]) {{
-                    const symbol = td[1].textContent.split(' ')[0];
-                    if(symbol) symbols.add(symbol);
-                }}
-            }}
-            
-            symbols.forEach(symbol => {{
-                const option = document.createElement('option');
-                option.value = symbol;
-                option.textContent = symbol;
-                filter.appendChild(option);
-            }});
-        }}
-        
-        function filterTrades() {{
-            const symbolFilter = document.getElementById('symbolFilter').value;
-            const sideFilter = document.getElementById('sideFilter').value;
-            const table = document.getElementById('tradesTable');
-            const tr = table.getElementsByTagName('tr');
-            
-            for (let i = 1; i < tr.length; i++) {{
-                const td = tr[i].getElementsByTagName('td');
-                let show = true;
-                
-                if(symbolFilter && td[1]) {{
-                    const symbol = td[1].textContent.split(' ')[0];
-                    if(symbol !== symbolFilter) show = false;
-                }}
-                
-                if(sideFilter && td[2]) {{
-                    const side = td[2].textContent;
-                    if(side !== sideFilter) show = false;
-                }}
-                
-                tr[i].style.display = show ? '' : 'none';
-            }}
-        }}
-        
-        document.addEventListener('DOMContentLoaded', function() {{
-            populateSymbolFilter();
-        }});
-        </script>
-    </head>
-    <body>
+    html = PAGE_HEAD + f"""
+    <body data-version="{f['version']}">
         <div class="container">
             <div class="header">
                 <h1>🚀 Rafique Trading Dashboard</h1>
@@ -1227,9 +871,7 @@ def dashboard():
             <div class="main-content">
                 <div class="controls">
                     <input type="text" id="searchInput" class="search-box" placeholder="🔍 Search trades..." onkeyup="searchTrades()">
-                    <select id="symbolFilter" class="filter-select" onchange="filterTrades()">
-                        <option value="">All Symbols</option>
-                    </select>
+                    <select id="symbolFilter" class="filter-select" onchange="filterTrades()">{f['symbol_options_html']}</select>
                     <select id="sideFilter" class="filter-select" onchange="filterTrades()">
                         <option value="">All Sides</option>
                         <option value="LONG">LONG</option>
@@ -1243,60 +885,80 @@ def dashboard():
                 
                 <div class="dashboard-top">
                     <div class="left-panel">
-                        <div class="stats-overview">
-                            <div class="stat-card">
-                                <h3>All Time P&L</h3>
-                                <div class="value {'positive' if all_time >= 0 else 'negative'}">{all_time:.2f} USDT</div>
-                            </div>
-                            <div class="stat-card">
-                                <h3>Total Trades</h3>
-                                <div class="value">{completed_trades_count}</div>
-                            </div>
-                            <div class="stat-card">
-                                <h3>Win Rate</h3>
-                                <div class="value">{risk_metrics.get('win_rate', 0):.1f}%</div>
-                            </div>
-                            <div class="stat-card">
-                                <h3>Profit Factor</h3>
-                                <div class="value">{risk_metrics.get('profit_factor', 0):.2f}</div>
-                            </div>
-                        </div>
+                        <div class="stats-overview" id="statsPanel">{f['stats_html']}</div>
                         
                         <div class="section">
                             <h3>📊 Performance Analytics</h3>
-                            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; height: 100%;">
-                                {summary_html}
-                                {risk_metrics_html}
-                            </div>
+                            <div id="analyticsPanel" style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; height: 100%;">{f['analytics_html']}</div>
                         </div>
                     </div>
                     
                     <div class="right-panel">
-                        <div class="section">
-                            <h3>📈 Open Positions ({len(open_trades)})</h3>
-                            {open_html}
-                        </div>
+                        <div class="section" id="openPanel">{f['open_html']}</div>
                     </div>
                 </div>
                 
-                {trade_history_html}
+                {f['trade_history_html']}
             </div>
         </div>
+        <div id="toast"></div>
+        <dialog id="confirmDialog">
+            <form method="dialog">
+                <p></p>
+                <div class="dialog-buttons">
+                    <button value="cancel" class="btn-secondary">Cancel</button>
+                    <button value="ok" class="btn-danger">Close Trade</button>
+                </div>
+            </form>
+        </dialog>
     </body>
     </html>
     """
     return HTMLResponse(html)
 
+@app.get("/api/dashboard-fragments")
+def api_dashboard_fragments(version: str = ""):
+    """Fragments for the page's in-place refresh; history is only resent when trades.csv changed"""
+    f = dashboard_fragments()
+    if f["version"] == version:
+        f["trade_history_html"] = None
+        f["symbol_options_html"] = None
+    return JSONResponse(f)
+
+def trade_records(df):
+    """Trade rows as JSON-ready records: parsed dates as ISO strings, NaT -> None"""
+    dt = df["__dt_parsed"]
+    out = df.assign(__dt_parsed=dt.dt.strftime("%Y-%m-%dT%H:%M:%S").astype(object).where(dt.notna(), None))
+    if not ORJSON_AVAILABLE:
+        # orjson writes NaN as null on its own; stdlib json would write a bare NaN
+        out = out.astype(object).where(out.notna(), None)
+    return out.to_dict(orient="records")
+
+@app.get("/api/trade-history")
+def api_trade_history(offset: int = 0, limit: int = HISTORY_PAGE_TRADES, version: str = ""):
+    """Row HTML for older trades of the history table, newest first"""
+    sig = csv_signature()
+    current = csv_version(sig)
+    if version != current:
+        # The table on the page is from an older trades.csv; its next refresh replaces it
+        return JSONResponse({"version": current, "rows_html": None, "next": offset})
+    groups, _ = _history_views(sig)[-1]
+    offset = max(offset, 0)
+    page = groups[offset:offset + max(limit, 0)]
+    return JSONResponse({"version": current, "rows_html": "".join(page), "next": offset + len(page),
+                         "total": len(groups)})
+
 @app.get("/api/trades")
 def api_trades():
-    df = load_trades()
+    # Read-only use: the cached frame is serialised as is, no per-request copy
+    df = _load_trades_cached(csv_signature())
     if df.empty: 
         return JSONResponse([])
-
-    out = df.copy()
     
-    # ✅ FIXED: NaN values ko handle karo with custom encoder
-    return JSONResponse(out.to_dict(orient="records"))
+    records = trade_records(df)
+    if ORJSON_AVAILABLE:
+        return Response(orjson.dumps(records), media_type="application/json")
+    return Response(json.dumps(records), media_type="application/json")
 
 @app.get("/api/open-trades")
 def api_open_trades():
@@ -1307,55 +969,60 @@ def api_open_trades():
 @app.post("/close_trade/{symbol}")
 def close_trade(symbol: str):
     try:
-        state = load_state()
-        open_trades = state.get("open_trades", {})
+        # Price lookup is network I/O: do it before taking the state lock
+        current_price = get_current_price(symbol) if symbol in read_state().get("open_trades", {}) else None
+        with _state_write_lock:
+            return _close_trade_locked(symbol, current_price)
+    except Exception as e:
+        return {"status": "error", "message": f"Error closing trade: {str(e)}"}
+
+def _close_trade_locked(symbol, current_price):
+    """close_trade body; runs under _state_write_lock"""
+    state = load_state()
+    open_trades = state.get("open_trades", {})
+    
+    if symbol in open_trades:
+        trade_info = open_trades[symbol]
+        entry_price = safe_float_convert(trade_info.get("entry_price", 0))
+        quantity = safe_float_convert(trade_info.get("remaining_quantity") or trade_info.get("quantity", 0))
+        side = trade_info.get("side", "")
+        trade_num = trade_info.get("trade_num", 0)
         
-        if symbol in open_trades:
-            trade_info = open_trades[symbol]
-            entry_price = safe_float_convert(trade_info.get("entry_price", 0))
-            quantity = safe_float_convert(trade_info.get("remaining_quantity") or trade_info.get("quantity", 0))
-            side = trade_info.get("side", "")
-            trade_num = trade_info.get("trade_num", 0)
-            
-            current_price = get_current_price(symbol)
-            if current_price is None:
-                current_price = entry_price
-            
-            if side == "long":
-                pnl = (current_price - entry_price) * quantity
-            else:
-                pnl = (entry_price - current_price) * quantity
-            
-            del open_trades[symbol]
-            save_state(state)
-            
-            try:
-                exit_row = {
-                    "Trade #": str(trade_num),
-                    "Symbol": symbol.replace('USDT', ''),
-                    "Side": side.upper(),
-                    "Type": f"{symbol} {side.upper()}",
-                    "Date/Time": datetime.now().strftime("%b %d, %Y, %H:%M"),
-                    "Signal": "Exit",
-                    "Price": f"{current_price:.8f}",
-                    "Position size": f"{quantity:.6f} ({round(quantity*current_price,2):.2f} USDT)",
-                    "Net P&L": f"{pnl:+.2f} USDT",
-                    "Run-up": "0",
-                    "Drawdown": "0",
-                    "Cumulative P&L": ""
-                }
-                
-                append_trade_row(exit_row)
-                
-            except Exception as e:
-                print(f"Error logging trade closure: {e}")
-            
-            return {"status": "ok", "message": f"Trade {symbol} closed successfully", "pnl": round(pnl, 2)}
+        if current_price is None:
+            current_price = entry_price
+        
+        if side == "long":
+            pnl = (current_price - entry_price) * quantity
         else:
-            return {"status": "error", "message": "Trade not found in open positions"}
+            pnl = (entry_price - current_price) * quantity
+        
+        del open_trades[symbol]
+        save_state(state)
+        
+        try:
+            exit_row = {
+                "Trade #": str(trade_num),
+                "Symbol": symbol.replace('USDT', ''),
+                "Side": side.upper(),
+                "Type": f"{symbol} {side.upper()}",
+                "Date/Time": datetime.now().strftime("%b %d, %Y, %H:%M"),
+                "Signal": "Exit",
+                "Price": f"{current_price:.8f}",
+                "Position size": f"{quantity:.6f} ({round(quantity*current_price,2):.2f} USDT)",
+                "Net P&L": f"{pnl:+.2f} USDT",
+                "Run-up": "0",
+                "Drawdown": "0",
+                "Cumulative P&L": ""
+            }
             
-    except Exception as e:
-        return {"status": "error", "message": f"Error closing trade: {str(e)}"}
+            append_trade_row(exit_row)
+            
+        except Exception as e:
+            print(f"Error logging trade closure: {e}")
+        
+        return {"status": "ok", "message": f"Trade {symbol} closed successfully", "pnl": round(pnl, 2)}
+    else:
+        return {"status": "error", "message": "Trade not found in open positions"}
 
 @app.post("/update_sltp/{symbol}")
 async def update_sltp(symbol: str, request: Request):
@@ -1367,55 +1034,75 @@ async def update_sltp(symbol: str, request: Request):
         tp2 = body.get("tp2", "")
         tp3 = body.get("tp3", "")
         
+        # The lock can be held by a close rewriting trades.csv; wait for it off the event loop
+        return await run_in_threadpool(_update_sltp_locked, symbol, sl, tp1, tp2, tp3)
+    except Exception as e:
+        print(f"Error updating SL/TP: {e}")
+        return {"status": "error", "message": str(e)}
+
+def _update_sltp_locked(symbol, sl, tp1, tp2, tp3):
+    """update_sltp body; runs under _state_write_lock"""
+    with _state_write_lock:
         state = load_state()
         open_trades = state.get("open_trades", {})
-        
+
         if symbol in open_trades:
             if sl:
                 try:
                     sl_float = float(sl)
-                    state["open_trades"][symbol]["sl"] = f"{sl_float:.4f}"
+                    state["open_trades"][symbol]["sl"] = sl_float
                 except ValueError:
                     return {"status": "error", "message": "Invalid SL format"}
-            
+
             if tp1:
                 try:
                     tp1_float = float(tp1)
-                    state["open_trades"][symbol]["tp1"] = f"{tp1_float:.4f}"
+                    state["open_trades"][symbol]["tp1"] = tp1_float
                 except ValueError:
                     return {"status": "error", "message": "Invalid TP1 format"}
-            
+
             if tp2:
                 try:
                     tp2_float = float(tp2)
-                    state["open_trades"][symbol]["tp2"] = f"{tp2_float:.4f}"
+                    state["open_trades"][symbol]["tp2"] = tp2_float
                 except ValueError:
                     return {"status": "error", "message": "Invalid TP2 format"}
-            
+
             if tp3:
                 try:
                     tp3_float = float(tp3)
-                    state["open_trades"][symbol]["tp3"] = f"{tp3_float:.4f}"
+                    state["open_trades"][symbol]["tp3"] = tp3_float
                 except ValueError:
                     return {"status": "error", "message": "Invalid TP3 format"}
-            
+
             save_state(state)
             print(f"SL/TP updated for {symbol}: SL={sl}, TP1={tp1}, TP2={tp2}, TP3={tp3}")
             return {"status": "ok", "symbol": symbol, "sl": sl, "tp1": tp1, "tp2": tp2, "tp3": tp3}
         return {"status": "error", "message": "Symbol not found in open trades"}
-    except Exception as e:
-        print(f"Error updating SL/TP: {e}")
-        return {"status": "error", "message": str(e)}
+
+EXPORT_CHUNK_ROWS = 10000
+
+def _csv_chunks(df):
+    """trades as CSV text, header first, then EXPORT_CHUNK_ROWS rows at a time"""
+    yield df.iloc[:0].to_csv(index=False)
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        yield df.iloc[start:start + EXPORT_CHUNK_ROWS].to_csv(index=False, header=False)
 
 @app.get("/export/trades")
 def export_trades(format: str = "csv"):
-    df = load_trades()
+    df = _load_trades_cached(csv_signature())
     if format == "csv":
-        csv_content = df.to_csv(index=False)
-        return JSONResponse({"content": csv_content, "filename": "trades.csv"})
+        # Streamed as a file download: no whole-file string, no JSON escaping of the CSV text
+        return StreamingResponse(_csv_chunks(df), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=trades.csv"})
     elif format == "json":
-        # ✅ FIXED: NaN values handle karo JSON mein with custom encoder
-        return JSONResponse({"content": json.dumps(df.to_dict(orient="records"), indent=2, cls=SafeJSONEncoder), "filename": "trades.json"})
+        records = trade_records(df)
+        if ORJSON_AVAILABLE:
+            content = orjson.dumps(records, option=orjson.OPT_INDENT_2)
+        else:
+            content = json.dumps(records, indent=2)
+        return Response(content, media_type="application/json",
+                        headers={"Content-Disposition": "attachment; filename=trades.json"})
     else:
         return JSONResponse({"error": "Unsupported format"}, status_code=400)
 
@@ -1,14 +1,38 @@
 import time
+from collections import deque
 import requests
-import pandas as pd
 import numpy as np
 
+# Compiled indicator kernel (falls back to the same loop in plain Python)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ numba not available, indicators run in plain Python: {e}")
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+# Live closes from Binance's public kline stream (falls back to simulated prices)
+try:
+    from binance import ThreadedWebsocketManager
+    BINANCE_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ python-binance not available, using simulated prices: {e}")
+    ThreadedWebsocketManager = None
+    BINANCE_AVAILABLE = False
+
 # Bot API URL
 BOT_URL = "http://127.0.0.1:8000"  # local bot
 
+# One keep-alive connection to the bot, reused by every order
+_http = requests.Session()
+
 # Symbol & interval
 SYMBOL = "BTCUSDT"
 INTERVAL = 60  # seconds per candle, example 1 min
+KLINE_INTERVAL = "1m"  # same candle length for the stream
 
 # Indicator settings
 EMA_SHORT = 9
@@ -17,40 +41,56 @@ RSI_PERIOD = 14
 RSI_OVERSOLD = 30
 RSI_OVERBOUGHT = 70
 
-# Dummy price data (replace with real Binance fetch or CSV)
-price_data = []
+# Dummy price data (replace with real Binance fetch or CSV); the deque drops the oldest price itself
+price_data = deque(maxlen=EMA_LONG)
 
 def fetch_price():
     # Replace with real Binance API or CSV fetch
     # For test, we simulate random price
     import random
-    price = 50000 + random.uniform(-500, 500)
-    price_data.append(price)
-    if len(price_data) > EMA_LONG:
-        price_data.pop(0)
-    return price
-
-def calculate_ema(prices, period):
-    return pd.Series(prices).ewm(span=period, adjust=False).mean().iloc[-1]
-
-def calculate_rsi(prices, period):
-    delta = pd.Series(prices).diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=period).mean().iloc[-1]
-    avg_loss = loss.rolling(window=period).mean().iloc[-1]
-    if avg_loss == 0:
-        return 100
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return 50000 + random.uniform(-500, 500)
+
+@njit(cache=True)
+def ema_rsi(closes, ema_s_p, ema_l_p, rsi_p):
+    """Short EMA, long EMA and RSI of closes in one pass.
+
+    The EMAs match ewm(span=p, adjust=False) seeded with the first close.
+    The RSI is the simple average of the last rsi_p moves; a missing move
+    before the first close counts as flat, and fewer than rsi_p closes give NaN.
+    """
+    n = len(closes)
+    a_s = 2.0 / (ema_s_p + 1)
+    a_l = 2.0 / (ema_l_p + 1)
+    ema_s = closes[0]
+    ema_l = closes[0]
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, n):
+        c = closes[i]
+        ema_s += a_s * (c - ema_s)
+        ema_l += a_l * (c - ema_l)
+        if i >= n - rsi_p:
+            d = c - closes[i - 1]
+            if d > 0:
+                gain += d
+            else:
+                loss -= d
+    if n < rsi_p:
+        rsi = np.nan
+    elif loss == 0:
+        rsi = 100.0
+    else:
+        rsi = 100 - 100 / (1 + gain / loss)
+    return ema_s, ema_l, rsi
+
+# Compile at import so the first candle doesn't pay for it
+ema_rsi(np.zeros(EMA_LONG), EMA_SHORT, EMA_LONG, RSI_PERIOD)
 
 def check_signal():
     if len(price_data) < EMA_LONG:
         return None
-    ema_short = calculate_ema(price_data, EMA_SHORT)
-    ema_long = calculate_ema(price_data, EMA_LONG)
-    rsi = calculate_rsi(price_data, RSI_PERIOD)
+    closes = np.fromiter(price_data, dtype=np.float64, count=len(price_data))
+    ema_short, ema_long, rsi = ema_rsi(closes, EMA_SHORT, EMA_LONG, RSI_PERIOD)
 
     # Buy Signal
     if ema_short > ema_long and rsi < RSI_OVERSOLD:
@@ -62,16 +102,38 @@ def check_signal():
 
 def send_order(action, quantity=0.001):
     try:
-        response = requests.get(f"{BOT_URL}/{action.lower()}", params={"symbol": SYMBOL, "quantity": quantity})
+        response = _http.get(f"{BOT_URL}/{action.lower()}", params={"symbol": SYMBOL, "quantity": quantity})
         print(f"{action} order response: {response.json()}")
     except Exception as e:
         print(f"Error sending order: {e}")
 
+def on_closed_candle(price):
+    price_data.append(price)
+    signal = check_signal()
+    if signal:
+        print(f"Signal detected: {signal} at price {price}")
+        send_order(signal)
+
+def run_stream():
+    """Push every closed candle from the kline stream; no polling, no REST payload per tick"""
+    twm = ThreadedWebsocketManager()
+    twm.start()
+
+    def handle(msg):
+        k = msg.get("k") if isinstance(msg, dict) else None
+        if k is None:
+            print(f"Stream message without kline: {msg}")
+            return
+        if k.get("x"):  # candle closed
+            on_closed_candle(float(k["c"]))
+
+    twm.start_kline_socket(callback=handle, symbol=SYMBOL, interval=KLINE_INTERVAL)
+    twm.join()
+
 if __name__ == "__main__":
-    while True:
-        price = fetch_price()
-        signal = check_signal()
-        if signal:
-            print(f"Signal detected: {signal} at price {price}")
-            send_order(signal)
-        time.sleep(INTERVAL)
+    if BINANCE_AVAILABLE:
+        run_stream()
+    else:
+        while True:
+            on_closed_candle(fetch_price())
+            time.sleep(INTERVAL)
@@ -0,0 +1,220 @@
+function updateSLTP(sym) {
+    let sl = document.getElementById("sl_"+sym).value;
+    let tp1 = document.getElementById("tp1_"+sym).value;
+    let tp2 = document.getElementById("tp2_"+sym).value;
+    let tp3 = document.getElementById("tp3_"+sym).value;
+
+    fetch(`/update_sltp/${sym}`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            sl: sl,
+            tp1: tp1,
+            tp2: tp2,
+            tp3: tp3
+        })
+    })
+    .then(r => r.json())
+    .then(d => {
+        if(d.status === 'ok') {
+            showToast('SL/TP updated successfully!');
+            refreshDashboard();
+        } else {
+            showToast('Error updating SL/TP: ' + d.message, 'error');
+        }
+    })
+    .catch(error => {
+        showToast('Error updating SL/TP: ' + error, 'error');
+    });
+}
+
+function closeTrade(sym) {
+    confirmDialog('Are you sure you want to close this trade?').then(ok => {
+        if (!ok) return;
+        fetch('/close_trade/'+sym, { method: 'POST' })
+            .then(r => r.json())
+            .then(d => {
+                if(d.status === 'ok') {
+                    showToast('Trade closed successfully!');
+                    refreshDashboard();
+                } else {
+                    showToast('Error closing trade: ' + d.message, 'error');
+                }
+            })
+            .catch(error => {
+                showToast('Error closing trade: ' + error, 'error');
+            });
+    });
+}
+
+// Toasts and the <dialog> confirm replace alert/confirm, which block the page
+// (refresh timer included) until they are dismissed
+let toastTimer = null;
+
+function showToast(message, kind) {
+    const toast = document.getElementById('toast');
+    toast.textContent = message;
+    toast.className = 'show ' + (kind || 'success');
+    clearTimeout(toastTimer);
+    toastTimer = setTimeout(() => {
+        toast.className = '';
+    }, 3000);
+}
+
+function confirmDialog(message) {
+    const dialog = document.getElementById('confirmDialog');
+    dialog.querySelector('p').textContent = message;
+    dialog.returnValue = '';
+    dialog.showModal();
+    // The form's method="dialog" buttons set returnValue; Esc closes with ''
+    return new Promise(resolve => {
+        dialog.addEventListener('close', () => resolve(dialog.returnValue === 'ok'), { once: true });
+    });
+}
+
+// Rows carry data-search/data-symbol/data-side from the server, so filtering only reads
+// attributes and flips one class; typing is debounced so a burst of keys filters once
+let searchTimer = null;
+
+function searchTrades() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(applyTradeFilters, 120);
+}
+
+function applyTradeFilters() {
+    // Filters cover the whole history, so fetch the trades not loaded yet first
+    const active = document.getElementById('searchInput').value ||
+                   document.getElementById('symbolFilter').value ||
+                   document.getElementById('sideFilter').value;
+    if (active && historyRemaining() > 0) {
+        loadMoreHistory(true);
+    } else {
+        filterLoadedRows();
+    }
+}
+
+function filterLoadedRows() {
+    const table = document.getElementById('tradesTable');
+    if (!table) return;
+    const search = document.getElementById('searchInput').value.toLowerCase();
+    const symbolFilter = document.getElementById('symbolFilter').value;
+    const sideFilter = document.getElementById('sideFilter').value;
+
+    for (const tr of table.querySelectorAll('tr.trade-row')) {
+        const show = (!search || tr.dataset.search.includes(search)) &&
+                     (!symbolFilter || tr.dataset.symbol === symbolFilter) &&
+                     (!sideFilter || tr.dataset.side === sideFilter);
+        tr.classList.toggle('hidden', !show);
+    }
+}
+
+// The page holds the newest trades only; older ones are fetched as the table scrolls
+// to its end (or all at once when a filter needs them)
+let historyLoading = null;
+let historyObserver = null;
+
+function historyRemaining() {
+    const panel = document.getElementById('historyPanel');
+    if (!panel || !panel.dataset.total) return 0;
+    return Number(panel.dataset.total) - Number(panel.dataset.loaded);
+}
+
+function loadMoreHistory(all) {
+    if (historyLoading) {
+        // A scroll load may be in flight; a filter still needs the rest after it
+        return all ? historyLoading.then(() => loadMoreHistory(true)) : historyLoading;
+    }
+    const remaining = historyRemaining();
+    if (remaining <= 0) return Promise.resolve();
+
+    const panel = document.getElementById('historyPanel');
+    const version = document.body.dataset.version || '';
+    const limit = all ? remaining : 200;
+    historyLoading = fetch(`/api/trade-history?offset=${panel.dataset.loaded}&limit=${limit}` +
+                           `&version=${encodeURIComponent(version)}`)
+        .then(r => r.json())
+        .then(d => {
+            if (d.rows_html === null) {
+                // trades.csv changed under the page: swap in the new table instead
+                refreshDashboard();
+                return;
+            }
+            panel.querySelector('#tradesTable tbody').insertAdjacentHTML('beforeend', d.rows_html);
+            panel.dataset.loaded = d.next;
+            filterLoadedRows();
+            watchHistorySentinel();
+        })
+        .catch(error => {
+            console.error('Loading trade history failed:', error);
+        })
+        .finally(() => {
+            historyLoading = null;
+        });
+    return historyLoading;
+}
+
+function watchHistorySentinel() {
+    // (Re)observing also fires at once if the sentinel is still in view after a load
+    if (historyObserver) historyObserver.disconnect();
+    const sentinel = document.getElementById('historySentinel');
+    if (!sentinel || historyRemaining() <= 0) return;
+    historyObserver = new IntersectionObserver(entries => {
+        if (entries.some(e => e.isIntersecting)) loadMoreHistory(false);
+    }, { root: sentinel.closest('.trade-history-container'), rootMargin: '200px' });
+    historyObserver.observe(sentinel);
+}
+
+function exportTrades(format) {
+    // The server answers with a file download, so the browser saves it directly
+    window.location.href = `/export/trades?format=${format}`;
+}
+
+// Options come prerendered from the server; keep the current choice if it still exists
+function setSymbolOptions(optionsHtml) {
+    const filter = document.getElementById('symbolFilter');
+    const selected = filter.value;
+    filter.innerHTML = optionsHtml;
+    filter.value = selected;
+    if (filter.value !== selected) filter.value = '';
+}
+
+function filterTrades() {
+    applyTradeFilters();
+}
+
+// Swap in freshly rendered fragments instead of reloading the whole page
+function refreshDashboard() {
+    const version = document.body.dataset.version || '';
+    fetch('/api/dashboard-fragments?version=' + encodeURIComponent(version))
+        .then(r => r.json())
+        .then(d => {
+            document.getElementById('statsPanel').innerHTML = d.stats_html;
+            document.getElementById('analyticsPanel').innerHTML = d.analytics_html;
+
+            // Leave the position cards alone while an SL/TP box is being edited
+            const openPanel = document.getElementById('openPanel');
+            const active = document.activeElement;
+            if (!(active && active.tagName === 'INPUT' && openPanel.contains(active))) {
+                openPanel.innerHTML = d.open_html;
+            }
+
+            // History only comes back when trades.csv changed
+            if (d.trade_history_html !== null) {
+                document.getElementById('historyPanel').outerHTML = d.trade_history_html;
+                document.body.dataset.version = d.version;
+                setSymbolOptions(d.symbol_options_html);
+                applyTradeFilters();
+                watchHistorySentinel();
+            }
+        })
+        .catch(error => {
+            console.error('Dashboard refresh failed:', error);
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    watchHistorySentinel();
+    setInterval(refreshDashboard, 15000);
+});